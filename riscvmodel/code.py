@@ -1,10 +1,16 @@
 import argparse
+from array import array
 from tempfile import mkstemp
+import struct
 import subprocess
+import sys
 
 from .insn import *
 from . import __version__
 
+# Array typecode of 32-bit words, the size of the C types depends on the platform
+_WORD_TYPECODE = next(typecode for typecode in "IL" if array(typecode).itemsize == 4)
+
 class MachineDecodeError(Exception):
     def __init__(self, word):
         self.word = word
@@ -14,32 +20,125 @@ class MachineDecodeError(Exception):
 def decode(word: int, variant: Variant=RV32I):
     if word & 0x3 != 3:
         # compact
-        for icls in get_insns(cls=InstructionCType):
-            if icls._match(word):
+        for icls in get_compressed_decode_table(variant).get(word & COMPRESSED_DECODE_MASK, ()):
+            if icls.match(word):
                 i = icls()
                 i.decode(word)
                 return i
         raise MachineDecodeError(word)
-    opcode = word & 0x7F
-    for icls in get_insns(variant=variant):
-        if icls.field_opcode.value == opcode and icls.match(word):
-            i = icls()
-            i.decode(word)
-            return i
-    raise MachineDecodeError(word)
+    icls = decode_instruction(word, variant)
+    if icls is None:
+        raise MachineDecodeError(word)
+    i = icls()
+    i.decode(word)
+    return i
+
+
+def decode_batch(words, variant: Variant=RV32I) -> list:
+    """
+    Decode a sequence of machine code words. The decode table of the variant is
+    fetched once for the sequence and looked up for every word. Compressed
+    words are decoded with :func:`decode`.
+
+    :param words: Iterable of machine codes as 32-bit integers
+    :param variant: Restrict to instructions of this variant
+    :return: List of decoded instructions
+    """
+    insns = []
+    # Bind the lookups used for every word once
+    append = insns.append
+    lookup = get_decode_table(variant).get
+    for word in words:
+        if word & 0x3 != 3:
+            append(decode(word, variant))
+            continue
+        icls = lookup(word & DECODE_MASK)
+        if icls is None:
+            raise MachineDecodeError(word)
+        i = icls()
+        i.decode(word)
+        append(i)
+    return insns
+
+
+def decode_buffer(buf, variant: Variant=RV32I) -> list:
+    """
+    Decode a buffer of machine code. The buffer contains 32-bit little-endian
+    words, so its length must be a multiple of four.
+
+    :param buf: Bytes-like object with machine code
+    :param variant: Restrict to instructions of this variant
+    :return: List of decoded instructions
+    """
+    return decode_batch((word for word, in struct.iter_unpack("<I", buf)), variant)
+
+
+class InstructionBuffer:
+    """
+    Compact sequence of instructions. The instructions are stored as machine
+    code in an array of 32-bit words and only decoded to :class:`Instruction`
+    objects when they are accessed.
+
+    :param words: Iterable of machine codes as 32-bit integers
+    :param variant: Restrict to instructions of this variant
+    """
+    def __init__(self, words=(), variant: Variant=RV32I):
+        self.variant = variant
+        self.words = array(_WORD_TYPECODE, words)
+
+    @classmethod
+    def from_buffer(cls, buf, variant: Variant=RV32I):
+        """
+        Create from a buffer of 32-bit little-endian machine code words
+
+        :param buf: Bytes-like object with machine code
+        :param variant: Restrict to instructions of this variant
+        :return: Instruction buffer
+        """
+        ibuf = cls(variant=variant)
+        ibuf.words.frombytes(buf)
+        if sys.byteorder == "big":
+            ibuf.words.byteswap()
+        return ibuf
+
+    def append(self, insn: Instruction):
+        """Append an instruction in its encoded form"""
+        self.words.append(insn.encode())
+
+    def classes(self) -> list:
+        """
+        Get the instruction classes of all words without decoding them
+
+        :return: List of instruction classes, None for words that do not decode
+        """
+        table = get_decode_table(self.variant)
+        return [table.get(word & DECODE_MASK) for word in self.words]
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index: int) -> Instruction:
+        return decode(self.words[index], self.variant)
+
+    def __iter__(self):
+        return iter(decode_batch(self.words, self.variant))
 
 
 def read_from_binary(fname: str, *, stoponerror: bool = False):
     with open(fname, "rb") as f:
-        insn = f.read(4)
-        while insn:
-            try:
-                yield decode(int.from_bytes(insn, 'little'))
-            except MachineDecodeError as e:
-                if stoponerror:
-                    return
-                raise(e)
-            insn = f.read(4)
+        data = f.read()
+    # Unpack all complete words at once, a trailing partial word is decoded as is
+    full = len(data) & ~3
+    words = [word for word, in struct.iter_unpack("<I", memoryview(data)[:full])]
+    if full < len(data):
+        words.append(int.from_bytes(data[full:], 'little'))
+    for word in words:
+        try:
+            yield decode(word)
+        except MachineDecodeError as e:
+            if stoponerror:
+                return
+            raise(e)
 
 def machinsn_decode():
     parser = argparse.ArgumentParser(description='Disassemble a machine instruction.')
@@ -86,7 +86,7 @@ def traces_from_rvfi(rvfi: RVFISignals) -> list:
     if rvfi.rd_addr == 0 and rvfi.rd_wdata != 0:
         raise ValueError("rd[0] cannot be written by core")
     if rvfi.rd_addr != 0:
-        if "rd" in insn.__dict__:
+        if hasattr(insn, "rd"):
             reg = Register(32)
             reg.set(rvfi.rd_wdata)
             t.append(TraceIntegerRegister(rvfi.rd_addr, reg))
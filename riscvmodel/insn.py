@@ -5,6 +5,8 @@
 Instructions
 """
 
+from operator import eq, ne, lt, ge
+
 from .isa import *
 from .variant import *
 from .model import State
@@ -16,276 +18,348 @@ class InstructionLUI(InstructionUType):
     of the destination register. The lower bits are set to zero in the destination register. This instruction
     can be used to efficiently form constants, as a sequence of LUI and ORI for example.
     """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = (self.imm << 12)
+        model.state.intreg[self.rd] = self.imm.value << 12
 
 
 @isa("auipc", RV32I, opcode=0b0010111)
 class InstructionAUIPC(InstructionUType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.pc + (self.imm << 12)
+        model.state.intreg[self.rd] = model.state.pc.value + (self.imm.value << 12)
 
 
 @isa("jal", RV32I, opcode=0b1101111)
 class InstructionJAL(InstructionJType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.pc + 4
-        model.state.pc += self.imm
+        state = model.state
+        state.intreg[self.rd] = state.pc.value + 4
+        state.set_pc(state.pc.value + self.imm.value)
 
 
 @isa("jalr", RV32I, opcode=0b1100111, funct3=0b000)
 class InstructionJALR(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.pc + 4
-        model.state.pc = model.state.intreg[self.rs1] + self.imm
+        state = model.state
+        intreg = state.intreg
+        intreg[self.rd] = state.pc.value + 4
+        # The lowest bit of the target is cleared
+        state.set_pc((intreg[self.rs1].value + self.imm.value) & ~1)
 
 
 @isa("beq", RV32I, opcode=0b1100011, funct3=0b000)
 class InstructionBEQ(InstructionBType):
-    def execute(self, model: Model):
-        # todo: problem with __cmp__
-        if model.state.intreg[self.rs1].value == model.state.intreg[self.rs2].value:
-            model.state.pc = model.state.pc + self.imm
+    __slots__ = ()
+
+    condition = eq
 
 
 @isa("bne", RV32I, opcode=0b1100011, funct3=0b001)
 class InstructionBNE(InstructionBType):
-    def execute(self, model: Model):
-        if model.state.intreg[self.rs1].value != model.state.intreg[self.rs2].value:
-            model.state.pc = model.state.pc + self.imm
+    __slots__ = ()
+
+    condition = ne
 
 
 @isa("blt", RV32I, opcode=0b1100011, funct3=0b100)
 class InstructionBLT(InstructionBType):
-    def execute(self, model: Model):
-        if model.state.intreg[self.rs1].value < model.state.intreg[self.rs2].value:
-            model.state.pc = model.state.pc + self.imm
+    __slots__ = ()
+
+    condition = lt
 
 
 @isa("bge", RV32I, opcode=0b1100011, funct3=0b101)
 class InstructionBGE(InstructionBType):
-    def execute(self, model: Model):
-        if model.state.intreg[self.rs1].value >= model.state.intreg[self.rs2].value:
-            model.state.pc = model.state.pc + self.imm
+    __slots__ = ()
+
+    condition = ge
 
 
 @isa("bltu", RV32I, opcode=0b1100011, funct3=0b110)
 class InstructionBLTU(InstructionBType):
-    def execute(self, model: Model):
-        if model.state.intreg[self.rs1].unsigned() < model.state.intreg[
-                self.rs2].unsigned():
-            model.state.pc = model.state.pc + self.imm
+    __slots__ = ()
+
+    condition = lt
+    compare_unsigned = True
 
 
 @isa("bgeu", RV32I, opcode=0b1100011, funct3=0b111)
 class InstructionBGEU(InstructionBType):
-    def execute(self, model: Model):
-        if model.state.intreg[self.rs1].unsigned() >= model.state.intreg[
-                self.rs2].unsigned():
-            model.state.pc = model.state.pc + self.imm
+    __slots__ = ()
+
+    condition = ge
+    compare_unsigned = True
 
 
 @isa("lb", RV32I, opcode=0b0000011, funct3=0b000)
 class InstructionLB(InstructionILType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        data = model.state.memory.lb((model.state.intreg[self.rs1] + self.imm).unsigned())
-        if (data >> 7) & 0x1:
-            data |= 0xFFFFFF00
-        model.state.intreg[self.rd] = data
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        data = model.state.memory.lb((src.value + self.imm.value) & src.mask)
+        intreg[self.rd] = (data ^ 0x80) - 0x80
 
 
 @isa("lh", RV32I, opcode=0b0000011, funct3=0b001)
 class InstructionLH(InstructionILType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        data = model.state.memory.lh((model.state.intreg[self.rs1] + self.imm).unsigned())
-        if (data >> 15) & 0x1:
-            data |= 0xFFFF0000
-        model.state.intreg[self.rd] = data
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        data = model.state.memory.lh((src.value + self.imm.value) & src.mask)
+        intreg[self.rd] = (data ^ 0x8000) - 0x8000
 
 
 @isa("lw", RV32I, opcode=0b0000011, funct3=0b010)
 class InstructionLW(InstructionILType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        data = model.state.memory.lw((model.state.intreg[self.rs1] + self.imm).unsigned())
-        model.state.intreg[self.rd] = data
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        data = model.state.memory.lw((src.value + self.imm.value) & src.mask)
+        intreg[self.rd] = data
 
 
 @isa("lbu", RV32I, opcode=0b0000011, funct3=0b100)
 class InstructionLBU(InstructionILType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.memory.lb(
-            (model.state.intreg[self.rs1] + self.imm).unsigned())
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        intreg[self.rd] = model.state.memory.lb((src.value + self.imm.value) & src.mask)
 
 
 @isa("lhu", RV32I, opcode=0b0000011, funct3=0b101)
 class InstructionLHU(InstructionILType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.memory.lh(
-            (model.state.intreg[self.rs1] + self.imm).unsigned())
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        intreg[self.rd] = model.state.memory.lh((src.value + self.imm.value) & src.mask)
 
 
 @isa("sb", RV32I, opcode=0b0100011, funct3=0b000)
 class InstructionSB(InstructionSType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.memory.sb((model.state.intreg[self.rs1] + self.imm).unsigned(),
-                        model.state.intreg[self.rs2])
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        model.state.memory.sb((src.value + self.imm.value) & src.mask, intreg[self.rs2].value)
 
 
 @isa("sh", RV32I, opcode=0b0100011, funct3=0b001)
 class InstructionSH(InstructionSType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.memory.sh((model.state.intreg[self.rs1] + self.imm).unsigned(),
-                        model.state.intreg[self.rs2])
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        model.state.memory.sh((src.value + self.imm.value) & src.mask, intreg[self.rs2].value)
 
 
 @isa("sw", RV32I, opcode=0b0100011, funct3=0b010)
 class InstructionSW(InstructionSType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.memory.sw((model.state.intreg[self.rs1] + self.imm).unsigned(),
-                        model.state.intreg[self.rs2])
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        model.state.memory.sw((src.value + self.imm.value) & src.mask, intreg[self.rs2].value)
 
 
 @isa("addi", RV32I, opcode=0b0010011, funct3=0b000)
 class InstructionADDI(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] + self.imm
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value + self.imm.value
 
 
 @isa("slti", RV32I, opcode=0b0010011, funct3=0b010)
 class InstructionSLTI(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        if model.state.intreg[self.rs1] < self.imm:
-            model.state.intreg[self.rd] = 1
-        else:
-            model.state.intreg[self.rd] = 0
+        intreg = model.state.intreg
+        intreg[self.rd] = int(intreg[self.rs1].value < self.imm.value)
 
 
 @isa("sltiu", RV32I, opcode=0b0010011, funct3=0b011)
 class InstructionSLTIU(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        if model.state.intreg[self.rs1].unsigned() < int(self.imm):
-            model.state.intreg[self.rd] = 1
-        else:
-            model.state.intreg[self.rd] = 0
+        intreg = model.state.intreg
+        src = intreg[self.rs1]
+        # The immediate is sign-extended, but compared as unsigned
+        intreg[self.rd] = int(src.unsigned() < (self.imm.value & src.mask))
 
 
 @isa("xori", RV32I, opcode=0b0010011, funct3=0b100)
 class InstructionXORI(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] ^ self.imm
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value ^ self.imm.value
 
 
 @isa("ori", RV32I, opcode=0b0010011, funct3=0b110)
 class InstructionORI(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] | self.imm
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value | self.imm.value
 
 
 @isa("andi", RV32I, opcode=0b0010011, funct3=0b111)
 class InstructionANDI(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] & self.imm
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value & self.imm.value
 
 
 @isa("slli", RV32I, opcode=0b0010011, funct3=0b001, funct7=0b0000000)
 class InstructionSLLI(InstructionISType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] << self.shamt
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value << self.shamt.value
 
 
 @isa("srli", RV32I, opcode=0b0010011, funct3=0b101, funct7=0b0000000)
 class InstructionSRLI(InstructionISType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1].unsigned() >> int(
-            self.shamt)
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].unsigned() >> self.shamt.value
 
 
 @isa("srai", RV32I, opcode=0b0010011, funct3=0b101, funct7=0b0100000)
 class InstructionSRAI(InstructionISType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] >> self.shamt
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value >> self.shamt.value
 
 
 @isa("add", RV32I, opcode=0b0110011, funct3=0b000, funct7=0b0000000)
 class InstructionADD(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] + model.state.intreg[self.rs2]
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value + intreg[self.rs2].value
 
 
 @isa("sub", RV32I, opcode=0b0110011, funct3=0b000, funct7=0b0100000)
 class InstructionSUB(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] - model.state.intreg[self.rs2]
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value - intreg[self.rs2].value
 
 
 @isa("sll", RV32I, opcode=0b0110011, funct3=0b001, funct7=0b0000000)
 class InstructionSLL(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] << (
-            model.state.intreg[self.rs2] & 0x1f)
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value << (intreg[self.rs2].value & 0x1f)
 
 
 @isa("slt", RV32I, opcode=0b0110011, funct3=0b010, funct7=0b0000000)
 class InstructionSLT(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        if model.state.intreg[self.rs1] < model.state.intreg[self.rs2]:
-            model.state.intreg[self.rd] = 1
-        else:
-            model.state.intreg[self.rd] = 0
+        intreg = model.state.intreg
+        intreg[self.rd] = int(intreg[self.rs1] < intreg[self.rs2])
 
 
 @isa("sltu", RV32I, opcode=0b0110011, funct3=0b011, funct7=0b0000000)
 class InstructionSLTU(InstructionRType):
-    def execute(self, state: State):
-        if state.intreg[self.rs1].unsigned() < state.intreg[
-                self.rs2].unsigned():
-            state.intreg[self.rd] = 1
-        else:
-            state.intreg[self.rd] = 0
+    __slots__ = ()
+
+    def execute(self, model: Model):
+        intreg = model.state.intreg
+        intreg[self.rd] = int(intreg[self.rs1].unsigned() < intreg[self.rs2].unsigned())
 
 
 @isa("xor", RV32I, opcode=0b0110011, funct3=0b100, funct7=0b0000000)
 class InstructionXOR(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] ^ model.state.intreg[self.rs2]
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value ^ intreg[self.rs2].value
 
 
 @isa("srl", RV32I, opcode=0b0110011, funct3=0b101, funct7=0b0000000)
 class InstructionSRL(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        src = model.state.intreg[self.rs1]
-        shift = model.state.intreg[self.rs2] & 0x1f
-        model.state.intreg[self.rd] = src >> shift
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].unsigned() >> (intreg[self.rs2].value & 0x1f)
 
 
 @isa("sra", RV32I, opcode=0b0110011, funct3=0b101, funct7=0b0100000)
 class InstructionSRA(InstructionRType):
-    def execute(self, model: Model):
-        usrc = model.state.intreg[self.rs1].unsigned()
-        shift = model.state.intreg[self.rs2].unsigned() & 0x1f
-        if usrc >> 31:
-            to_clear = 32 - shift
-            sign_mask = (((1 << 32) - 1) >> to_clear) << to_clear
-        else:
-            sign_mask = 0
+    __slots__ = ()
 
-        model.state.intreg[self.rd] = sign_mask | (usrc >> shift)
+    def execute(self, model: Model):
+        intreg = model.state.intreg
+        # Registers hold sign-extended values, so this shift is arithmetic
+        intreg[self.rd] = intreg[self.rs1].value >> (intreg[self.rs2].value & 0x1f)
 
 
 @isa("or", RV32I, opcode=0b0110011, funct3=0b110, funct7=0b0000000)
 class InstructionOR(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] | model.state.intreg[self.rs2]
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value | intreg[self.rs2].value
 
 
 @isa("and", RV32I, opcode=0b0110011, funct3=0b111, funct7=0b0000000)
 class InstructionAND(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] & model.state.intreg[self.rs2]
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1].value & intreg[self.rs2].value
 
 
 @isa("fence", RV32I, opcode=0b0001111, funct3=0b000)
 class InstructionFENCE(InstructionIType):
+    __slots__ = ()
+
     isa_format_id = "FENCE"
 
     def execute(self, model: Model):
@@ -294,12 +368,16 @@ class InstructionFENCE(InstructionIType):
 
 @isa("fence.i", RV32IZifencei, opcode=0b0001111, funct3=0b001)
 class InstructionFENCEI(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
 
 @isa("ecall", RV32I, opcode=0b1110011, funct3=0b000, imm=0b000000000000, rd=0b00000, rs1=0b00000)
 class InstructionECALL(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         model.environment.call(model.state)
 
@@ -310,6 +388,9 @@ class InstructionECALL(InstructionIType):
 @isa("uret", RV32I, opcode=0b1110011, funct3=0b000, imm=0b000000000010, rs1=0b00000, rd=0b00000)
 class InstructionURET(InstructionIType):
     """ Machine level exception return """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -318,6 +399,9 @@ class InstructionURET(InstructionIType):
 @isa("sret", RV32I, opcode=0b1110011, funct3=0b000, imm=0b000100000010, rs1=0b00000, rd=0b00000)
 class InstructionSRET(InstructionIType):
     """ Machine level exception return """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -326,6 +410,9 @@ class InstructionSRET(InstructionIType):
 @isa("hret", RV32I, opcode=0b1110011, funct3=0b000, imm=0b001000000010, rs1=0b00000, rd=0b00000)
 class InstructionHRET(InstructionIType):
     """ Machine level exception return """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -334,6 +421,9 @@ class InstructionHRET(InstructionIType):
 @isa("mret", RV32I, opcode=0b1110011, funct3=0b000, imm=0b001100000010, rs1=0b00000, rd=0b00000)
 class InstructionMRET(InstructionIType):
     """ Machine level exception return """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -341,12 +431,16 @@ class InstructionMRET(InstructionIType):
 
 @isa("wfi", RV32I, opcode=0b1110011, funct3=0b000, imm=0b000100000101, rs1=0b00000, rd=0b00000)
 class InstructionWFI(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
 
 @isa("ebreak", RV32I, opcode=0b1110011, funct3=0b000, imm=0b000000000001)
 class InstructionEBREAK(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
@@ -356,18 +450,24 @@ class InstructionEBREAK(InstructionIType):
 
 @isa("csrrw", RV32IZicsr, opcode=0b1110011, funct3=0b001)
 class InstructionCSRRW(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
 
 @isa("csrrs", RV32IZicsr, opcode=0b1110011, funct3=0b010)
 class InstructionCSRRS(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
 
 @isa("csrrc", RV32IZicsr, opcode=0b1110011, funct3=0b011)
 class InstructionCSRRC(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
@@ -392,39 +492,56 @@ class InstructionCSRRC(InstructionIType):
 
 @isa("lwu", RV64I, opcode=0b0000011, funct3=0b110)
 class InstructionLWU(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
 
 @isa("ld", RV64I, opcode=0b0000011, funct3=0b011)
 class InstructionLD(InstructionIType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
 
 @isa("sd", RV64I, opcode=0b0100011, funct3=0b011)
 class InstructionSD(InstructionISType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         pass
 
 
 @isa_pseudo()
 class InstructionNOP(InstructionADDI):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(0, 0, 0)
 
+    def execute(self, model: Model):
+        # Writes to x0 are discarded, so there is nothing to compute
+        pass
+
     def __str__(self):
         return "nop"
 
 
 @isa("mul", RV32IM, opcode=0b0110011, funct3=0b000, funct7=0b0000001)
 class InstructionMUL(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs1] * model.state.intreg[self.rs2]
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs1] * intreg[self.rs2]
 
 
 @isa("mulh", RV32IM, opcode=0b0110011, funct3=0b001, funct7=0b0000001)
 class InstructionMULH(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -432,6 +549,8 @@ class InstructionMULH(InstructionRType):
 
 @isa("mulhsu", RV32IM, opcode=0b0110011, funct3=0b010, funct7=0b0000001)
 class InstructionMULHSU(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -439,6 +558,8 @@ class InstructionMULHSU(InstructionRType):
 
 @isa("mulhu", RV32IM, opcode=0b0110011, funct3=0b011, funct7=0b0000001)
 class InstructionMULHU(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -446,6 +567,8 @@ class InstructionMULHU(InstructionRType):
 
 @isa("div", RV32IM, opcode=0b0110011, funct3=0b100, funct7=0b0000001)
 class InstructionDIV(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -453,6 +576,8 @@ class InstructionDIV(InstructionRType):
 
 @isa("divu", RV32IM, opcode=0b0110011, funct3=0b101, funct7=0b0000001)
 class InstructionDIVU(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -460,6 +585,8 @@ class InstructionDIVU(InstructionRType):
 
 @isa("rem", RV32IM, opcode=0b0110011, funct3=0b110, funct7=0b0000001)
 class InstructionREM(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -467,6 +594,8 @@ class InstructionREM(InstructionRType):
 
 @isa("remu", RV32IM, opcode=0b0110011, funct3=0b111, funct7=0b0000001)
 class InstructionREMU(InstructionRType):
+    __slots__ = ()
+
     def execute(self, model: Model):
         # TODO: implement
         pass
@@ -474,15 +603,20 @@ class InstructionREMU(InstructionRType):
 
 @isa_c("c.addi", RV32IC, opcode=1, funct3=0b000)
 class InstructionCADDI(InstructionCIType):
+    __slots__ = ()
+
     def expand(self):
         pass
 
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rd] + self.imm
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rd].value + self.imm.value
 
 
 @isa_c("c.andi", RV32IC, opcode=1, funct3=0b100)
 class InstructionCANDI(InstructionCBType):
+    __slots__ = ()
+
     def expand(self):
         pass
 
@@ -492,6 +626,8 @@ class InstructionCANDI(InstructionCBType):
 
 @isa_c("c.swsp", RV32IC, opcode=2, funct3=6)
 class InstructionCSWSP(InstructionCSSType):
+    __slots__ = ()
+
     def expand(self):
         pass
 
@@ -507,206 +643,229 @@ class InstructionCSWSP(InstructionCSSType):
 
 @isa_c("c.li", RV32IC, opcode=1, funct3=2)
 class InstructionCLI(InstructionCIType):
+    __slots__ = ()
+
     def expand(self):
         pass
 
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = self.imm
+        model.state.intreg[self.rd] = self.imm.value
 
 
 @isa_c("c.mv", RV32IC, opcode=2, funct4=8)
 class InstructionCMV(InstructionCRType):
+    __slots__ = ()
+
     def expand(self):
         pass
 
     def execute(self, model: Model):
-        model.state.intreg[self.rd] = model.state.intreg[self.rs]
+        intreg = model.state.intreg
+        intreg[self.rd] = intreg[self.rs]
 
 
 @isa("lr", RV32A, opcode=0b0101111, funct5=0b00010, funct3=0b010)
 class InstructionLR(InstructionAMOType):
     """ Load reserved """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
         # Perform a normal load
-        data = model.state.memory.lw(model.state.intreg[self.rs1].unsigned())
-        model.state.intreg[self.rd] = data
+        intreg[self.rd] = state.memory.lw(intreg[self.rs1].unsigned())
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("sc", RV32A, opcode=0b0101111, funct5=0b00011, funct3=0b010)
 class InstructionSC(InstructionAMOType):
     """ Store conditional """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
         # Check if this address is reserved
-        if model.state.atomic_reserved(model.state.intreg[self.rs1]):
-            model.state.memory.sw(
-                model.state.intreg[self.rs1].unsigned(),
-                model.state.intreg[self.rs2]
-            )
-            model.state.intreg[self.rd] = 0
+        if state.atomic_reserved(intreg[self.rs1]):
+            state.memory.sw(intreg[self.rs1].unsigned(), intreg[self.rs2].value)
+            intreg[self.rd] = 0
         else:
-            model.state.intreg[self.rd] = 1
+            intreg[self.rd] = 1
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amoadd", RV32A, opcode=0b0101111, funct5=0b00000, funct3=0b010)
 class InstructionAMOADD(InstructionAMOType):
     """ Atomic add operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            (model.state.intreg[self.rs2] + model.state.intreg[self.rd])
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, data + intreg[self.rs2].value)
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amoxor", RV32A, opcode=0b0101111, funct5=0b00100, funct3=0b010)
 class InstructionAMOXOR(InstructionAMOType):
     """ Atomic XOR operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            (model.state.intreg[self.rs2] ^ model.state.intreg[self.rd])
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, data ^ intreg[self.rs2].value)
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amoor",   RV32A, opcode=0b0101111, funct5=0b01000, funct3=0b010)
 class InstructionAMOOR(InstructionAMOType):
     """ Atomic OR operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            (model.state.intreg[self.rs2] | model.state.intreg[self.rd])
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, data | intreg[self.rs2].value)
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amoand", RV32A, opcode=0b0101111, funct5=0b01100, funct3=0b010)
 class InstructionAMOAND(InstructionAMOType):
     """ Atomic AND operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            (model.state.intreg[self.rs2] & model.state.intreg[self.rd])
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, data & intreg[self.rs2].value)
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amomin", RV32A, opcode=0b0101111, funct5=0b10000, funct3=0b010)
 class InstructionAMOMIN(InstructionAMOType):
     """ Atomic minimum operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            min(model.state.intreg[self.rs2], model.state.intreg[self.rd])
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, min((data ^ 0x80000000) - 0x80000000, intreg[self.rs2].value))
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amomax", RV32A, opcode=0b0101111, funct5=0b10100, funct3=0b010)
 class InstructionAMOMAX(InstructionAMOType):
     """ Atomic maximum operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            max(model.state.intreg[self.rs2], model.state.intreg[self.rd])
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, max((data ^ 0x80000000) - 0x80000000, intreg[self.rs2].value))
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amominu", RV32A, opcode=0b0101111, funct5=0b11000, funct3=0b010)
 class InstructionAMOMINU(InstructionAMOType):
     """ Atomic unsigned minimum operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            min(
-                model.state.intreg[self.rs2].unsigned(),
-                model.state.intreg[self.rd].unsigned()
-            )
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, min(data, intreg[self.rs2].unsigned()))
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amomaxu", RV32A, opcode=0b0101111, funct5=0b11100, funct3=0b010)
 class InstructionAMOMAXU(InstructionAMOType):
     """ Atomic unsigned maximum operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            max(
-                model.state.intreg[self.rs2].unsigned(),
-                model.state.intreg[self.rd].unsigned()
-            )
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, max(data, intreg[self.rs2].unsigned()))
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
 
 
 @isa("amoswap", RV32A, opcode=0b0101111, funct5=0b00001, funct3=0b010)
 class InstructionAMOSWAP(InstructionAMOType):
     """ Atomic swap operation """
+
+    __slots__ = ()
+
     def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        address = intreg[self.rs1].unsigned()
         # This models a single HART with 1 stage pipeline, so will always succeed
-        model.state.intreg[self.rd] = model.state.memory.lw(
-            model.state.intreg[self.rs1].unsigned()
-        )
-        model.state.memory.sw(
-            model.state.intreg[self.rs1].unsigned(),
-            model.state.intreg[self.rs2]
-        )
+        data = state.memory.lw(address)
+        intreg[self.rd] = data
+        state.memory.sw(address, intreg[self.rs2].value)
         # Perform correct lock or release actions
-        if self.rl: model.state.atomic_release(model.state.intreg[self.rs1])
-        elif self.aq: model.state.atomic_acquire(model.state.intreg[self.rs1])
+        if self.rl: state.atomic_release(intreg[self.rs1])
+        elif self.aq: state.atomic_acquire(intreg[self.rs1])
@@ -6,19 +6,211 @@ This is the basic ISA definition. It describes the instruction formats and base
 classes. Actual instructions are implemented in the insn module.
 """
 
-from random import randrange
-from abc import ABCMeta, abstractmethod
-from collections import namedtuple
+from random import getrandbits
+from functools import lru_cache
+from operator import attrgetter
 
 from .variant import Variant
 from .model import Model
 from .types import Immediate, Register
 from .variant import RV32I
 
-Field = namedtuple("Field", ["name", "base", "size", "offset", "description", "static", "value"])
-Field.__new__.__defaults__ = (None, None, None, 0, None, False, None)
+class Field:
+    """
+    Bit field of an instruction word. A field can be spread over multiple parts
+    in the word, then `base` and `size` are lists. The parts are concatenated
+    from the least significant bit of the value, starting at `offset`.
+
+    :param name: Name of the field
+    :param base: Lowest bit of the field (part) in the word
+    :param size: Number of bits of the field (part)
+    :param offset: Bit of the value where the first part starts
+    :param description: Human readable description
+    :param static: The field has a fixed value for an instruction
+    :param value: Value of a static field
+    """
+    __slots__ = ("name", "base", "size", "offset", "description", "static", "value", "parts")
+
+    def __init__(self, name: str = None, base=None, size=None, offset: int = 0,
+                 description: str = None, static: bool = False, value: int = None):
+        self.name = name
+        self.base = base
+        self.size = size
+        self.offset = offset
+        self.description = description
+        self.static = static
+        self.value = value
+        bases = base if isinstance(base, list) else [base]
+        sizes = size if isinstance(size, list) else [size]
+        # Normalized parts as (base, size, offset in the value)
+        parts = []
+        for pbase, psize in zip(bases, sizes):
+            parts.append((pbase, psize, offset))
+            offset += psize
+        self.parts = tuple(parts)
+
+    def _asdict(self) -> dict:
+        return {"name": self.name, "base": self.base, "size": self.size, "offset": self.offset,
+                "description": self.description, "static": self.static, "value": self.value}
+
+    def _replace(self, **kwargs) -> "Field":
+        values = self._asdict()
+        values.update(kwargs)
+        field = Field(**values)
+        # Instructions share equal fields, like the same funct3 value
+        return _FIELDS.setdefault(field, field)
+
+    def __eq__(self, other):
+        return isinstance(other, Field) and self._asdict() == other._asdict()
+
+    def __hash__(self):
+        return hash((self.name, self.offset, self.static, self.value, self.parts))
+
+    def __repr__(self):
+        return "Field({})".format(", ".join("{}={!r}".format(k, v) for k, v in self._asdict().items()))
+
+
+# Fields with a value set by the decorators, shared between instructions
+_FIELDS = {}
+
+# Masks for bit fields by field size
+FIELD_MASKS = tuple((1 << size) - 1 for size in range(33))
+
+# Bits of a 32-bit instruction word holding opcode, funct3 and funct7 (which
+# includes funct5). All static fields are located within those bits.
+DECODE_MASK = 0xFE00707F
+
+# Bits of a 16-bit compressed instruction holding opcode and funct3. The
+# instructions that share them are told apart by their match() function.
+COMPRESSED_DECODE_MASK = 0xE003
 
-class Instruction(metaclass=ABCMeta):
+# Lookup tables from the decode bits of a word to the matching instruction
+# class by variant, built lazily by get_decode_table()
+_DECODE_TABLES = {}
+
+# Lookup tables from the decode bits of a compressed word to the candidate
+# instruction classes by variant, built lazily by get_compressed_decode_table()
+_COMPRESSED_DECODE_TABLES = {}
+
+# Instructions below a class, and of a variant below a class, built lazily by
+# get_insns()
+_INSNS_CACHE = {}
+
+# Instructions by mnemonic, built lazily by reverse_lookup()
+_MNEMONIC_MAP = None
+
+# Compiled field accessors by source, shared between instructions
+_ACCESSORS = {}
+
+class ImmediateProperty(property):
+    """
+    Property for an :class:`Immediate` of an instruction. It carries the
+    configuration of the immediate, so that it is available from the class
+    without creating an instruction.
+
+    :param fget: Getter of the stored immediate
+    :param fset: Setter of the property
+    :param bits: Number of bits of the immediate
+    :param signed: Whether the immediate is signed
+    :param lsb0: Whether the least significant bit is always 0
+    """
+    def __init__(self, fget, fset, *, bits: int, signed: bool = False, lsb0: bool = False):
+        super().__init__(fget, fset)
+        self.bits = bits
+        self.signed = signed
+        self.lsb0 = lsb0
+
+    def new(self, init: int = None) -> Immediate:
+        """
+        Create an immediate of this configuration.
+
+        :param init: Initial value of the immediate
+        :return: New immediate
+        """
+        return Immediate(bits=self.bits, signed=self.signed, lsb0=self.lsb0, init=init)
+
+
+def immediate_property(name: str, *, bits: int, signed: bool = False, lsb0: bool = False) -> ImmediateProperty:
+    """
+    Property for an :class:`Immediate` of an instruction, which is stored in the
+    attribute `name`. The immediate cannot be overwritten, use set() on it.
+
+    :param name: Attribute that stores the immediate
+    :param bits: Number of bits of the immediate
+    :param signed: Whether the immediate is signed
+    :param lsb0: Whether the least significant bit is always 0
+    :return: Property object
+    """
+    def setter(self, value):
+        raise AttributeError("Instruction does not allow to overwrite immediates, use set() on them")
+
+    return ImmediateProperty(attrgetter(name), setter, bits=bits, signed=signed, lsb0=lsb0)
+
+
+def random_registers(variant: Variant, count: int) -> list:
+    """
+    Draw random register indices for a variant. All indices are taken from the
+    bytes of a single random number.
+
+    :param variant: RISC-V ISA variant
+    :param count: Number of registers to draw
+    :return: List of register indices
+    """
+    if count == 0:
+        return []
+    mask = variant.intregs - 1
+    return [byte & mask for byte in getrandbits(8 * count).to_bytes(count, "little")]
+
+
+@lru_cache(maxsize=1024)
+def _parse_register(op: str) -> int:
+    """Parse a register operand like x5. Parsed operands are cached as they repeat."""
+    return int(op.strip()[1:])
+
+
+@lru_cache(maxsize=4096)
+def _parse_immediate(op: str) -> int:
+    """Parse an immediate operand in any base"""
+    return int(op, 0)
+
+
+def _field_mask(field: Field) -> int:
+    mask = 0
+    for base, size, _ in field.parts:
+        mask |= FIELD_MASKS[size] << base
+    return mask
+
+
+def _field_expr(field: Field, word: str = "word") -> str:
+    parts = []
+    for base, size, off in field.parts:
+        expr = "({} >> {})".format(word, base) if base > 0 else word
+        expr = "({} & {:#x})".format(expr, FIELD_MASKS[size])
+        if off > 0:
+            expr = "({} << {})".format(expr, off)
+        parts.append(expr)
+    return " | ".join(parts)
+
+
+def _field_insert_expr(field: Field, value: str = "value") -> str:
+    parts = []
+    for base, size, off in field.parts:
+        expr = "({} >> {})".format(value, off) if off > 0 else value
+        expr = "({} & {:#x})".format(expr, FIELD_MASKS[size])
+        if base > 0:
+            expr = "({} << {})".format(expr, base)
+        parts.append(expr)
+    return " | ".join(parts)
+
+
+def _compile_accessor(arg: str, expr: str):
+    source = "lambda {}: {}".format(arg, expr)
+    if source not in _ACCESSORS:
+        _ACCESSORS[source] = eval(source) # pylint: disable=eval-used
+    return _ACCESSORS[source]
+
+
+class Instruction:
     """
     Base class for instructions
 
@@ -26,6 +218,8 @@ class Instruction(metaclass=ABCMeta):
     their instruction type.
     """
 
+    __slots__ = ()
+
     # Class members starting with "field_" are defined by the ISA
     field_opcode = Field(name="opcode", base=0, size=7, description="", static=True)
 
@@ -39,61 +233,73 @@ class Instruction(metaclass=ABCMeta):
 
     asm_arg_signature = ""
 
+    # Operands of the instruction format, which define equality
+    operands = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # A new instruction invalidates the lookup tables
+        global _MNEMONIC_MAP # pylint: disable=global-statement
+        _MNEMONIC_MAP = None
+        _INSNS_CACHE.clear()
+        _DECODE_TABLES.clear()
+        _COMPRESSED_DECODE_TABLES.clear()
+        cls.update_fields()
+
     @classmethod
     def asm_signature(cls):
-        signature = cls.mnemonic
-        if len(cls.asm_arg_signature) > 0:
-            signature += " " + cls.asm_arg_signature
-        return signature
+        return cls._asm_signature
 
     @classmethod
     def extract_field(cls, field, word):
-        fname = "field_{}".format(field)
-        base = getattr(cls, fname).base
-        size = getattr(cls, fname).size
-        if not isinstance(base, list):
-            base = [base]
-            size = [size]
-        off = 0
-        value = 0
-        for part in range(len(base)):
-            value |= ((word >> base[part]) & (2**size[part] - 1)) << off
-            off += size[part]
-        return value << getattr(cls, fname).offset
+        return cls._extractors[field](word)
 
     @classmethod
     def set_field(cls, field, word, value):
-        fname = "field_{}".format(field)
-        base = getattr(cls, fname).base
-        size = getattr(cls, fname).size
-        if not isinstance(base, list):
-            base = [base]
-            size = [size]
-        off = getattr(cls, fname).offset
-        for part in range(len(base)):
-            word |= (((value >> off) & (2**size[part] - 1)) << base[part])
-            off += size[part]
-        return word
+        return word | cls._inserters[field](value)
+
+    @classmethod
+    def update_fields(cls):
+        """
+        Collect the fields and derived metadata of this instruction. This is
+        done when the class is created and must be repeated after a field or the
+        mnemonic is replaced, as the :func:`isa` decorator does.
+        """
+        cls._fields = tuple(getattr(cls, member) for member in dir(cls) if member.startswith("field_"))
+        cls._static_fields = tuple(field for field in cls._fields if field.static)
+        cls._nonstatic_fields = tuple(field for field in cls._fields if not field.static)
+        cls._extractors = {field.name: _compile_accessor("word", _field_expr(field)) for field in cls._fields}
+        cls._inserters = {field.name: _compile_accessor("value", _field_insert_expr(field)) for field in cls._fields}
+        cls._field_dicts = tuple(field._asdict() for field in cls._fields)
+        cls._asm_signature = cls.mnemonic
+        if cls.mnemonic and len(cls.asm_arg_signature) > 0:
+            cls._asm_signature += " " + cls.asm_arg_signature
+        # Operands fixed by the instruction (like the immediate of ecall) are
+        # not compared. When all other operands are encoded, the encoding is
+        # compared instead of the operands.
+        fixed = {field.name for field in cls._fields if field.value is not None}
+        encoded = {field.name for field in cls._nonstatic_fields}
+        cls._eq_operands = tuple(name for name in cls.operands if name not in fixed)
+        cls._eq_encode = all(name in encoded for name in cls._eq_operands)
 
     @classmethod
     def get_fields(cls):
-        return [getattr(cls, member) for member in dir(cls) if member.startswith("field_")]
+        return cls._fields
 
     @classmethod
     def get_static_fields(cls):
-        return [field for field in cls.get_fields() if field.static]
+        return cls._static_fields
 
     @classmethod
     def get_isa_format(cls, *, asdict: bool=False):
-        fields = [getattr(cls, attr) for attr in dir(cls) if attr.startswith("field_")]
         if asdict:
-            fields = [field._asdict() for field in fields]
-        return {"id": cls.isa_format_id, "fields": fields}
+            return {"id": cls.isa_format_id, "fields": [dict(field) for field in cls._field_dicts]}
+        return {"id": cls.isa_format_id, "fields": list(cls._fields)}
 
     @classmethod
     def match(cls, word: int):
         """Try to match a machine code to this instruction"""
-        for field in cls.get_static_fields():
+        for field in cls._static_fields:
             if cls.extract_field(field.name, word) != field.value:
                 return False
         return True
@@ -119,7 +325,38 @@ class Instruction(metaclass=ABCMeta):
         :param variant: RISC-V ISA variant :return: nothing
         """
 
-    @abstractmethod
+    @classmethod
+    def random_batch(cls, variant: Variant, count: int) -> list:
+        """
+        Create randomized instructions
+
+        Each operand field is drawn for all instructions at once, instead of
+        randomizing the instructions one by one.
+
+        :param variant: RISC-V ISA variant
+        :param count: Number of instructions
+        :return: List of instructions
+        """
+        insns = [cls() for _ in range(count)]
+        if count == 0:
+            return insns
+        for field in cls.get_fields():
+            if field.static:
+                continue
+            attr = getattr(insns[0], field.name)
+            if isinstance(attr, Immediate):
+                for insn, value in zip(insns, attr.random_batch(count)):
+                    getattr(insn, field.name).value = value
+            else:
+                if field.name in ["rd", "rs1", "rs2"]:
+                    values = random_registers(variant, count)
+                else:
+                    mask = FIELD_MASKS[field.size]
+                    values = [byte & mask for byte in getrandbits(8 * count).to_bytes(count, "little")]
+                for insn, value in zip(insns, values):
+                    setattr(insn, field.name, value)
+        return insns
+
     def execute(self, model: Model):
         """
         Execute this instruction
@@ -129,6 +366,7 @@ class Instruction(metaclass=ABCMeta):
         :param model: RISC-V core model
         :return: nothing
         """
+        raise NotImplementedError
 
     def decode(self, word: int):
         """
@@ -137,25 +375,24 @@ class Instruction(metaclass=ABCMeta):
         :param word: Machine code as 32-bit integer
         :type word: int
         """
-        for field in self.get_fields():
-            if field.static:
-                assert self.extract_field(field.name, word) == field.value
+        for field in self._static_fields:
+            assert self.extract_field(field.name, word) == field.value
+        for field in self._nonstatic_fields:
+            attr = getattr(self, field.name)
+            value = self.extract_field(field.name, word)
+            if isinstance(attr, Register):
+                attr.set(value)
+            elif isinstance(attr, Immediate):
+                attr.set_from_bits(value)
             else:
-                attr = getattr(self, field.name)
-                value = self.extract_field(field.name, word)
-                if isinstance(attr, Register):
-                    attr.set(value)
-                elif isinstance(attr, Immediate):
-                    attr.set_from_bits(value)
-                else:
-                    setattr(self, field.name, value)
+                setattr(self, field.name, value)
 
     def encode(self) -> int:
         """
         TODO: document
         """
         word = 0
-        for field in self.get_fields():
+        for field in self._fields:
             if field.value is not None:
                 word = self.set_field(field.name, word, field.value)
             else:
@@ -192,33 +429,56 @@ class Instruction(metaclass=ABCMeta):
         """
         return ""
 
-    def __setattr__(self, key, value):
-        if key in self.__dict__ and isinstance(self.__dict__[key], Immediate):
-            raise AttributeError(
-                "Instruction does not allow to overwrite immediates, use set() on them"
-            )
-        super().__setattr__(key, value)
+    def _operand_values(self):
+        values = []
+        for name in self._eq_operands:
+            value = getattr(self, name)
+            values.append(value.value if isinstance(value, Immediate) else value)
+        return tuple(values)
 
     def __eq__(self, other):
-        for field in self.get_fields():
-            if field.static:
-                if getattr(self, field) != getattr(other, field):
-                    return False
-            else:
-                if getattr(self, field[6:]) != getattr(other, field[6:]):
-                    return False
-        return True
+        if not isinstance(other, Instruction):
+            return NotImplemented
+        if type(self) is not type(other):
+            return False
+        values = self._operand_values()
+        other_values = other._operand_values()
+        if None in values or None in other_values:
+            # Instructions with unset operands are only equal to themselves
+            return self is other
+        if self._eq_encode:
+            return self.encode() == other.encode()
+        return values == other_values
+
+    def __hash__(self):
+        """
+        Hash of the instruction, which depends on its operands. An instruction
+        must not be modified while it is in a set or a key of a dict.
+        """
+        values = self._operand_values()
+        if self._eq_encode and None not in values:
+            return hash((type(self), self.encode()))
+        return hash((type(self), values))
+
+Instruction.update_fields()
+
+
+class InstructionFunct3Type(Instruction):
+    __slots__ = ()
 
-class InstructionFunct3Type(Instruction, metaclass=ABCMeta):
     field_funct3 = Field(name="funct3", base=12, size=3, description="", static=True)
 
-class InstructionFunct5Type(Instruction, metaclass=ABCMeta):
+class InstructionFunct5Type(Instruction):
+    __slots__ = ()
+
     field_funct5 = Field(name="funct5", base=27, size=5, description="", static=True)
 
-class InstructionFunct7Type(Instruction, metaclass=ABCMeta):
+class InstructionFunct7Type(Instruction):
+    __slots__ = ()
+
     field_funct7 = Field(name="funct7", base=25, size=7, description="", static=True)
 
-class InstructionRType(InstructionFunct3Type, InstructionFunct7Type, metaclass=ABCMeta):
+class InstructionRType(InstructionFunct3Type, InstructionFunct7Type):
     """
     R-type instructions are 3-register instructions which use two source
     registers and write one output register.
@@ -231,6 +491,9 @@ class InstructionRType(InstructionFunct3Type, InstructionFunct7Type, metaclass=A
     :type rs2: int
     """
 
+    __slots__ = ("rd", "rs1", "rs2")
+    operands = ("rd", "rs1", "rs2")
+
     isa_format_id = "R"
     asm_arg_signature = "<rd>, <rs1>, <rs2>"
 
@@ -246,12 +509,10 @@ class InstructionRType(InstructionFunct3Type, InstructionFunct7Type, metaclass=A
         self.rs2 = rs2
 
     def ops_from_list(self, ops):
-        (self.rd, self.rs1, self.rs2) = [int(op[1:]) for op in ops]
+        (self.rd, self.rs1, self.rs2) = [_parse_register(op) for op in ops]
 
     def randomize(self, variant: Variant):
-        self.rd = randrange(0, variant.xlen)
-        self.rs1 = randrange(0, variant.xlen)
-        self.rs2 = randrange(0, variant.xlen)
+        self.rd, self.rs1, self.rs2 = random_registers(variant, 3)
 
     def inopstr(self, model):
         opstr = "{:>3}={}, ".format("x{}".format(self.rs1),
@@ -265,11 +526,10 @@ class InstructionRType(InstructionFunct3Type, InstructionFunct7Type, metaclass=A
                                   model.state.intreg[self.rd])
 
     def __str__(self):
-        return "{} x{}, x{}, x{}".format(self.mnemonic, self.rd, self.rs1,
-                                         self.rs2)
+        return f"{self.mnemonic} x{self.rd}, x{self.rs1}, x{self.rs2}"
 
 
-class InstructionIType(InstructionFunct3Type, metaclass=ABCMeta):
+class InstructionIType(InstructionFunct3Type):
     """
     I-type instructions are registers that use one source register and an
     immediate to produce a new value for the destination register.
@@ -286,6 +546,9 @@ class InstructionIType(InstructionFunct3Type, metaclass=ABCMeta):
     :type imm: int
     """
 
+    __slots__ = ("rd", "rs1", "_imm")
+    operands = ("rd", "rs1", "imm")
+
     isa_format_id = "I"
     asm_arg_signature = "<rd>, <rs1>, <imm>"
 
@@ -293,28 +556,27 @@ class InstructionIType(InstructionFunct3Type, metaclass=ABCMeta):
     field_rs1 = Field(name="rs1", base=15, size=5, description="")
     field_imm = Field(name="imm", base=20, size=12, description="")
 
+    imm = immediate_property("_imm", bits=12, signed=True)
+
     def __init__(self, rd: int = None, rs1: int = None, imm: int = None):
         super(InstructionIType, self).__init__()
         self.rd = rd  # pylint: disable=C0103
         self.rs1 = rs1
-        self.imm = Immediate(bits=12, signed=True)
-        if imm is not None:
-            self.imm.set(imm)
+        self._imm = type(self).imm.new(imm)
 
     def ops_from_list(self, ops):
         if len(ops) == 0: # ecall
             return
-        self.rd = int(ops[0][1:])
+        self.rd = _parse_register(ops[0])
         if ops[1][0] == "x":
-            self.rs1 = int(ops[1][1:])
-            self.imm.set(int(ops[2], 0))
+            self.rs1 = _parse_register(ops[1])
+            self.imm.set(_parse_immediate(ops[2]))
         else: # Load
-            self.rs1 = int(ops[2][1:])
-            self.imm.set(int(ops[1], 0))
+            self.rs1 = _parse_register(ops[2])
+            self.imm.set(_parse_immediate(ops[1]))
 
     def randomize(self, variant: Variant):
-        self.rd = randrange(0, variant.xlen)
-        self.rs1 = randrange(0, variant.xlen)
+        self.rd, self.rs1 = random_registers(variant, 2)
         self.imm.randomize()
 
     def inopstr(self, model) -> str:
@@ -326,10 +588,9 @@ class InstructionIType(InstructionFunct3Type, metaclass=ABCMeta):
                                   model.state.intreg[self.rd])
 
     def __str__(self) -> str:
-        return "{} x{}, x{}, {}".format(self.mnemonic, self.rd, self.rs1,
-                                        self.imm)
+        return f"{self.mnemonic} x{self.rd}, x{self.rs1}, {self.imm}"
 
-class InstructionILType(InstructionIType, metaclass=ABCMeta):
+class InstructionILType(InstructionIType):
     """
     I-type instruction specialization for stores. The produce a different
     assembler than the base class
@@ -341,12 +602,14 @@ class InstructionILType(InstructionIType, metaclass=ABCMeta):
     :param imm: 12-bit signed immediate
     :type rs2: int
     """
+
+    __slots__ = ()
+
     def __str__(self):
-        return "{} x{}, {}(x{})".format(self.mnemonic, self.rd, self.imm,
-                                        self.rs1)
+        return f"{self.mnemonic} x{self.rd}, {self.imm}(x{self.rs1})"
 
 
-class InstructionISType(InstructionFunct3Type,InstructionFunct7Type, metaclass=ABCMeta):
+class InstructionISType(InstructionFunct3Type,InstructionFunct7Type):
     """
     Similar to R-Type instruction specialization for shifts by immediate.
 
@@ -358,28 +621,32 @@ class InstructionISType(InstructionFunct3Type,InstructionFunct7Type, metaclass=A
     :type imm: int
     """
 
+    __slots__ = ("rd", "rs1", "_shamt")
+    operands = ("rd", "rs1", "shamt")
+
     isa_format_id = "IS"
 
     field_rd = Field(name="rd", base=7, size=5, description="")
     field_rs1 = Field(name="rs1", base=15, size=5, description="")
     field_shamt = Field(name="shamt", base=20, size=5, description="")
 
+    shamt = immediate_property("_shamt", bits=5)
+
     asm_arg_signature = "<rd>, <rs1>, <shamt>"
 
     def __init__(self, rd: int = None, rs1: int = None, shamt: int = None):
         super(InstructionISType, self).__init__()
         self.rd = rd
         self.rs1 = rs1
-        self.shamt = Immediate(bits=5, init=shamt)
+        self._shamt = type(self).shamt.new(shamt)
 
     def ops_from_list(self, ops):
-        self.rd = int(ops[0][1:])
-        self.rs1 = int(ops[1][1:])
-        self.shamt.set(int(ops[2], 0))
+        self.rd = _parse_register(ops[0])
+        self.rs1 = _parse_register(ops[1])
+        self.shamt.set(_parse_immediate(ops[2]))
 
     def randomize(self, variant: Variant):
-        self.rd = randrange(0, variant.xlen)
-        self.rs1 = randrange(0, variant.xlen)
+        self.rd, self.rs1 = random_registers(variant, 2)
         self.shamt.randomize()
 
     def inopstr(self, model):
@@ -387,11 +654,10 @@ class InstructionISType(InstructionFunct3Type,InstructionFunct7Type, metaclass=A
                                   model.state.intreg[self.rs1])
 
     def __str__(self):
-        return "{} x{}, x{}, 0x{:02x}".format(self.mnemonic, self.rd, self.rs1,
-                                              self.shamt)
+        return f"{self.mnemonic} x{self.rd}, x{self.rs1}, 0x{self.shamt:02x}"
 
 
-class InstructionSType(InstructionFunct3Type, metaclass=ABCMeta):
+class InstructionSType(InstructionFunct3Type):
     """
     S-type instructions are used for stores. They don't have a destination
     register, but two source registers.
@@ -404,28 +670,32 @@ class InstructionSType(InstructionFunct3Type, metaclass=ABCMeta):
     :type imm: int
     """
 
+    __slots__ = ("rs1", "rs2", "_imm")
+    operands = ("rs1", "rs2", "imm")
+
     isa_format_id = "S"
 
     field_rs1 = Field(name="rs1", base=15, size=5, description="")
     field_rs2 = Field(name="rs2", base=20, size=5, description="")
     field_imm = Field(name="imm", base=[7, 25], size=[5, 7], description="")
 
+    imm = immediate_property("_imm", bits=12, signed=True)
+
     asm_arg_signature = "<rs2>, <imm>(<rs1>)"
 
     def __init__(self, rs1: int = None, rs2: int = None, imm: int = None):
         super(InstructionSType, self).__init__()
         self.rs1 = rs1
         self.rs2 = rs2
-        self.imm = Immediate(bits=12, signed=True, init=imm)
+        self._imm = type(self).imm.new(imm)
 
     def ops_from_list(self, ops):
-        self.rs1 = int(ops[2][1:])
-        self.rs2 = int(ops[0][1:])
-        self.imm.set(int(ops[1], 0))
+        self.rs1 = _parse_register(ops[2])
+        self.rs2 = _parse_register(ops[0])
+        self.imm.set(_parse_immediate(ops[1]))
 
     def randomize(self, variant: Variant):
-        self.rs1 = randrange(0, variant.xlen)
-        self.rs2 = randrange(0, variant.xlen)
+        self.rs1, self.rs2 = random_registers(variant, 2)
         self.imm.randomize()
 
     def inopstr(self, model):
@@ -436,10 +706,9 @@ class InstructionSType(InstructionFunct3Type, metaclass=ABCMeta):
         return opstr
 
     def __str__(self):
-        return "{} x{}, {}(x{})".format(self.mnemonic, self.rs2, self.imm,
-                                        self.rs1)
+        return f"{self.mnemonic} x{self.rs2}, {self.imm}(x{self.rs1})"
 
-class InstructionBType(InstructionFunct3Type, metaclass=ABCMeta):
+class InstructionBType(InstructionFunct3Type):
     """
     B-type instructions encode branches. Branches have two source registers that
     are compared. They then change the program counter by the immediate value.
@@ -453,30 +722,49 @@ class InstructionBType(InstructionFunct3Type, metaclass=ABCMeta):
     :type imm: int
     """
 
+    __slots__ = ("rs1", "rs2", "_imm")
+    operands = ("rs1", "rs2", "imm")
+
     isa_format_id = "B"
 
     field_rs1 = Field(name="rs1", base=15, size=5, description="")
     field_rs2 = Field(name="rs2", base=20, size=5, description="")
     field_imm = Field(name="imm", base=[8, 25, 7, 31], size=[4, 6, 1, 1], offset=1, description="")
 
+    imm = immediate_property("_imm", bits=13, signed=True, lsb0=True)
+
     asm_arg_signature = "<rs1>, <rs2>, <imm>"
 
+    # Branch condition of the instruction, a function of the two source
+    # register values, which are unsigned if compare_unsigned is set
+    condition = None
+    compare_unsigned = False
+
     def __init__(self, rs1: int = None, rs2: int = None, imm: int = None):
         super(InstructionBType, self).__init__()
         self.rs1 = rs1
         self.rs2 = rs2
-        self.imm = Immediate(bits=13, signed=True, lsb0=True, init=imm)
+        self._imm = type(self).imm.new(imm)
 
     def ops_from_list(self, ops):
-        self.rs1 = int(ops[0][1:])
-        self.rs2 = int(ops[1][1:])
-        self.imm.set(int(ops[2], 0))
+        self.rs1 = _parse_register(ops[0])
+        self.rs2 = _parse_register(ops[1])
+        self.imm.set(_parse_immediate(ops[2]))
 
     def randomize(self, variant: Variant):
-        self.rs1 = randrange(0, variant.xlen)
-        self.rs2 = randrange(0, variant.xlen)
+        self.rs1, self.rs2 = random_registers(variant, 2)
         self.imm.randomize()
 
+    def execute(self, model: Model):
+        state = model.state
+        intreg = state.intreg
+        if self.compare_unsigned:
+            taken = self.condition(intreg[self.rs1].unsigned(), intreg[self.rs2].unsigned())
+        else:
+            taken = self.condition(intreg[self.rs1].value, intreg[self.rs2].value)
+        if taken:
+            state.set_pc(state.pc.value + self.imm.value)
+
     def inopstr(self, model):
         opstr = "{:>3}={}, ".format("x{}".format(self.rs1),
                                     model.state.intreg[self.rs1])
@@ -485,10 +773,9 @@ class InstructionBType(InstructionFunct3Type, metaclass=ABCMeta):
         return opstr
 
     def __str__(self):
-        return "{} x{}, x{}, .{:+}".format(self.mnemonic, self.rs1, self.rs2,
-                                           self.imm)
+        return f"{self.mnemonic} x{self.rs1}, x{self.rs2}, .{self.imm:+}"
 
-class InstructionUType(Instruction, metaclass=ABCMeta):
+class InstructionUType(Instruction):
     """
     U-type instructions are used for constant formation and set the upper bits of a register.
 
@@ -498,20 +785,25 @@ class InstructionUType(Instruction, metaclass=ABCMeta):
     :type imm: int
     """
 
+    __slots__ = ("rd", "_imm")
+    operands = ("rd", "imm")
+
     field_rd = Field(name="rd", base=7, size=5, description="")
     field_imm = Field(name="imm", base=12, size=20, description="")
 
+    imm = immediate_property("_imm", bits=20)
+
     def __init__(self, rd: int = None, imm: int = None):
         super(InstructionUType, self).__init__()
         self.rd = rd  # pylint: disable=invalid-name
-        self.imm = Immediate(bits=20, init=imm)
+        self._imm = type(self).imm.new(imm)
 
     def ops_from_list(self, ops):
-        self.rd = int(ops[0][1:])
-        self.imm.set(int(ops[1], 0))
+        self.rd = _parse_register(ops[0])
+        self.imm.set(_parse_immediate(ops[1]))
 
     def randomize(self, variant: Variant):
-        self.rd = randrange(0, variant.xlen)
+        self.rd = random_registers(variant, 1)[0]
         self.imm.randomize()
 
     def outopstr(self, model):
@@ -519,10 +811,10 @@ class InstructionUType(Instruction, metaclass=ABCMeta):
                                   model.state.intreg[self.rd])
 
     def __str__(self):
-        return "{} x{}, {}".format(self.mnemonic, self.rd, self.imm)
+        return f"{self.mnemonic} x{self.rd}, {self.imm}"
 
 
-class InstructionJType(Instruction, metaclass=ABCMeta):
+class InstructionJType(Instruction):
     """
     J-type instruction are used for jump and link instructions.
 
@@ -532,22 +824,25 @@ class InstructionJType(Instruction, metaclass=ABCMeta):
     :type imm: int
     """
 
+    __slots__ = ("rd", "_imm")
+    operands = ("rd", "imm")
+
     field_rd = Field(name="rd", base=7, size=5, description="")
     field_imm = Field(name="imm", base=[21,20,12,31], size=[10,1,8,1], description="", offset=1)
 
+    imm = immediate_property("_imm", bits=21, signed=True, lsb0=True)
+
     def __init__(self, rd: int = None, imm: int = None):
         super(InstructionJType, self).__init__()
         self.rd = rd  # pylint: disable=invalid-name
-        self.imm = Immediate(bits=21, signed=True, lsb0=True)
-        if imm is not None:
-            self.imm.set(imm)
+        self._imm = type(self).imm.new(imm)
 
     def ops_from_list(self, ops):
-        self.rd = int(ops[0][1:])
+        self.rd = _parse_register(ops[0])
         self.imm.set(int(ops[1]))
 
     def randomize(self, variant: Variant):
-        self.rd = randrange(0, variant.xlen)
+        self.rd = random_registers(variant, 1)[0]
         self.imm.randomize()
 
     def outopstr(self, model):
@@ -555,70 +850,104 @@ class InstructionJType(Instruction, metaclass=ABCMeta):
                                   model.state.intreg[self.rd])
 
     def __str__(self):
-        return "{} x{}, .{:+}".format(self.mnemonic, self.rd, self.imm)
+        return f"{self.mnemonic} x{self.rd}, .{self.imm:+}"
 
 
-class InstructionCType(Instruction, metaclass=ABCMeta):
+class InstructionCType(Instruction):
     """
     Compact instructions
     """
-    @abstractmethod
+
+    __slots__ = ()
+
+    field_opcode = Field(name="opcode", base=0, size=2, description="", static=True)
+
     def expand(self):
         """
         Expand to full instruction
         """
+        raise NotImplementedError
+
+    @classmethod
+    def random_batch(cls, variant: Variant, count: int) -> list:
+        insns = [cls() for _ in range(count)]
+        for insn in insns:
+            insn.randomize(variant)
+        return insns
 
 
-class InstructionCBType(InstructionCType, metaclass=ABCMeta):
+class InstructionCBType(InstructionCType):
     """
     TODO: document
     """
+
+    __slots__ = ("rd", "_imm")
+    operands = ("rd", "imm")
+
+    field_funct3 = Field(name="funct3", base=13, size=3, description="", static=True)
+
+    imm = immediate_property("_imm", bits=6, signed=True, lsb0=True)
+
     def __init__(self, rd: int = None, imm: int = None):
         super(InstructionCBType, self).__init__()
         self.rd = rd  # pylint: disable=invalid-name
         if self.rd is not None:
             self.rd = rd + 8
-        self.imm = Immediate(bits=6, signed=True, lsb0=True)
-        if imm is not None:
-            self.imm.set(imm)
+        self._imm = type(self).imm.new(imm)
 
     def decode(self, machinecode: int):
         self.rd = machinecode
 
     def __str__(self):
-        return "{} x{}, {}".format(self.mnemonic, self.rd, self.imm)
+        return f"{self.mnemonic} x{self.rd}, {self.imm}"
 
 
-class InstructionCRType(InstructionCType, metaclass=ABCMeta):
+class InstructionCRType(InstructionCType):
     """
     TODO: document
     """
+
+    __slots__ = ("rd", "rs")
+    operands = ("rd", "rs")
+
+    field_funct4 = Field(name="funct4", base=12, size=4, description="", static=True)
+
     def __init__(self, rd: int = None, rs: int = None):
         super(InstructionCRType, self).__init__()
         self.rd = rd  # pylint: disable=invalid-name
         self.rs = rs  # pylint: disable=invalid-name
 
     def randomize(self, variant: Variant):
-        self.rd = randrange(8, 16)
-        self.rs = randrange(8, 16)
+        self.rd = 8 + getrandbits(3)
+        self.rs = 8 + getrandbits(3)
+
+    def decode(self, machinecode: int):
+        self.rd = (machinecode >> 7) & 0x1F
+        self.rs = (machinecode >> 2) & 0x1F
 
     def __str__(self):
-        return "{} x{}, x{}".format(self.mnemonic, self.rd, self.rs)
+        return f"{self.mnemonic} x{self.rd}, x{self.rs}"
 
 
-class InstructionCIType(InstructionCType, metaclass=ABCMeta):
+class InstructionCIType(InstructionCType):
     """
     TODO: document
     """
+
+    __slots__ = ("rd", "_imm")
+    operands = ("rd", "imm")
+
+    field_funct3 = Field(name="funct3", base=13, size=3, description="", static=True)
+
+    imm = immediate_property("_imm", bits=6, signed=True)
+
     def __init__(self, rd: int = None, imm: int = None):
         super(InstructionCIType, self).__init__()
         self.rd = rd  # pylint: disable=invalid-name
-        self.imm = Immediate(bits=6, signed=True, lsb0=True)
-        if imm is not None:
-            self.imm.set(imm)
+        self._imm = type(self).imm.new(imm)
 
     def randomize(self, variant: Variant):
-        self.rd = randrange(0, 16)
+        self.rd = getrandbits(4)
         self.imm.randomize()
 
     def decode(self, machinecode: int):
@@ -628,29 +957,35 @@ class InstructionCIType(InstructionCType, metaclass=ABCMeta):
         self.imm.set_from_bits((imm12 << 5) | imm6to2)
 
     def __str__(self):
-        return "{} x{}, {}".format(self.mnemonic, self.rd, self.imm)
+        return f"{self.mnemonic} x{self.rd}, {self.imm}"
 
 
-class InstructionCSSType(InstructionCType, metaclass=ABCMeta):
+class InstructionCSSType(InstructionCType):
     """
     TODO: document
     """
+
+    __slots__ = ("rs", "_imm")
+    operands = ("rs", "imm")
+
+    field_funct3 = Field(name="funct3", base=13, size=3, description="", static=True)
+
+    imm = immediate_property("_imm", bits=6, signed=True, lsb0=True)
+
     def __init__(self, rs: int = None, imm: int = None):
         super(InstructionCSSType, self).__init__()
         self.rs = rs  # pylint: disable=invalid-name
-        self.imm = Immediate(bits=6, signed=True, lsb0=True)
-        if imm is not None:
-            self.imm.set(imm)
+        self._imm = type(self).imm.new(imm)
 
     def __str__(self):
-        return "{} x{}, {}(x2)".format(self.mnemonic, self.rs, self.imm)
+        return f"{self.mnemonic} x{self.rs}, {self.imm}(x2)"
 
     def randomize(self, variant: Variant):
-        self.rs = randrange(0, 16)
+        self.rs = getrandbits(4)
         self.imm.randomize()
 
 
-class InstructionAMOType(InstructionFunct3Type, InstructionFunct5Type, metaclass=ABCMeta):
+class InstructionAMOType(InstructionFunct3Type, InstructionFunct5Type):
     """
     AMO-type instructions used a modified version of the R-type instruction.
     These are also 3-register instructions (use 2 source, write 1 output) but
@@ -669,6 +1004,9 @@ class InstructionAMOType(InstructionFunct3Type, InstructionFunct5Type, metaclass
     :type aq: int
     """
 
+    __slots__ = ("rd", "rs1", "rs2", "rl", "aq")
+    operands = ("rd", "rs1", "rs2", "rl", "aq")
+
     isa_format_id     = "R"
     asm_arg_signature = "<rd>, <rs1>, <rs2>, <rl>, <aq>"
 
@@ -694,14 +1032,12 @@ class InstructionAMOType(InstructionFunct3Type, InstructionFunct5Type, metaclass
         self.aq  = aq
 
     def ops_from_list(self, ops):
-        (self.rd, self.rs1, self.rs2, self.rl, self.aq) = [int(op[1:]) for ops in ops]
+        (self.rd, self.rs1, self.rs2, self.rl, self.aq) = [_parse_register(op) for op in ops]
 
     def randomize(self, variant: Variant):
-        self.rd  = randrange(0, variant.xlen)
-        self.rs1 = randrange(0, variant.xlen)
-        self.rs2 = randrange(0, variant.xlen)
-        self.rl  = randrange(0, variant.xlen)
-        self.aq  = randrange(0, variant.xlen)
+        self.rd, self.rs1, self.rs2 = random_registers(variant, 3)
+        self.rl  = getrandbits(1)
+        self.aq  = getrandbits(1)
 
     def inopstr(self, model):
         opstr = "{:>3}={}, ".format(
@@ -718,9 +1054,117 @@ class InstructionAMOType(InstructionFunct3Type, InstructionFunct5Type, metaclass
         )
 
     def __str__(self):
-        return "{} x{}, x{}, x{}, {}, {}".format(
-            self.mnemonic, self.rd, self.rs1, self.rs2, self.rl, self.aq
-        )
+        return f"{self.mnemonic} x{self.rd}, x{self.rs1}, x{self.rs2}, {self.rl}, {self.aq}"
+
+
+def _static_bits(cls):
+    """
+    Get the bits of a machine code that are defined by the static fields of an
+    instruction.
+
+    :param cls: Instruction class
+    :return: Tuple of mask and value, or None if a static field has no value
+    """
+    mask = 0
+    value = 0
+    for field in cls.get_static_fields():
+        if field.value is None:
+            return None
+        mask |= _field_mask(field)
+        value = cls.set_field(field.name, value, field.value)
+    return mask, value
+
+
+def _gen_match(cls):
+    """
+    Generate a match function for an instruction, which compares the static
+    bits of a machine code with a single mask operation.
+
+    :param cls: Instruction class
+    :return: match function
+    """
+    static = _static_bits(cls)
+    if static is None:
+        # Cannot match any word
+        def match(word: int):
+            return False
+    else:
+        def match(word: int, mask=static[0], value=static[1]):
+            return word & mask == value
+    match.__doc__ = Instruction.match.__doc__
+    return match
+
+
+def _gen_decode(cls):
+    """
+    Generate a decode function that is specialized to the fields of an
+    instruction. The field extraction and the sign extension of immediates are
+    inlined as arithmetic expressions.
+
+    :param cls: Instruction class
+    :return: decode function or None if the instruction cannot be specialized
+    """
+    static = _static_bits(cls)
+    if static is None:
+        return None
+    mask, value = static
+    body = []
+    for field in cls.get_fields():
+        if field.static:
+            continue
+        attr = getattr(cls, field.name, None)
+        expr = _field_expr(field)
+        if isinstance(attr, ImmediateProperty):
+            if attr.signed:
+                tcmask = 1 << (attr.bits - 1)
+                body.append("    self.{}.value = (({}) ^ {:#x}) - {:#x}".format(field.name, expr, tcmask, tcmask))
+            else:
+                body.append("    self.{}.value = {}".format(field.name, expr))
+        else:
+            body.append("    self.{} = {}".format(field.name, expr))
+
+    source = ["def decode(self, word):",
+              "    assert word & {:#x} == {:#x}".format(mask, value)] + body
+    namespace = {}
+    exec(compile("\n".join(source), "<decode {}>".format(cls.__name__), "exec"), namespace) # pylint: disable=exec-used
+    decode = namespace["decode"]
+    decode.__doc__ = Instruction.decode.__doc__
+    decode.generated = True
+    return decode
+
+
+def _gen_encode(cls):
+    """
+    Generate an encode function that is specialized to the fields of an
+    instruction. The fields with a fixed value are a constant and the other
+    fields are inserted with inlined arithmetic expressions.
+
+    :param cls: Instruction class
+    :return: encode function or None if the instruction cannot be specialized
+    """
+    static = _static_bits(cls)
+    if static is None:
+        return None
+    const = static[1]
+    parts = []
+    for field in cls.get_fields():
+        if field.value is not None:
+            const = cls.set_field(field.name, const, field.value)
+            continue
+        if isinstance(getattr(cls, field.name, None), ImmediateProperty):
+            value = "self.{}.value".format(field.name)
+        else:
+            value = "self.{}".format(field.name)
+        parts.append(_field_insert_expr(field, value))
+
+    source = ["def encode(self):",
+              "    return " + " | ".join(["{:#x}".format(const)] + parts)]
+    namespace = {}
+    exec(compile("\n".join(source), "<encode {}>".format(cls.__name__), "exec"), namespace) # pylint: disable=exec-used
+    encode = namespace["encode"]
+    encode.__doc__ = Instruction.encode.__doc__
+    encode.generated = True
+    return encode
 
 
 def isa(mnemonic: str,
@@ -747,6 +1191,19 @@ def isa(mnemonic: str,
             fid = "field_"+field
             assert fid in dir(wrapped), "Invalid field {} for {}".format(fid, wrapped.__name__)
             setattr(wrapped, fid, getattr(wrapped, fid)._replace(value=kwargs[field]))
+        wrapped.update_fields()
+
+        wrapped.match = staticmethod(_gen_match(wrapped))
+
+        # Specialize decode and encode unless the instruction implements them
+        if wrapped.decode is Instruction.decode or getattr(wrapped.decode, "generated", False):
+            decode = _gen_decode(wrapped)
+            if decode is not None:
+                wrapped.decode = decode
+        if wrapped.encode is Instruction.encode or getattr(wrapped.encode, "generated", False):
+            encode = _gen_encode(wrapped)
+            if encode is not None:
+                wrapped.encode = encode
 
         return wrapped
     return wrapper
@@ -767,15 +1224,22 @@ def isa_c(mnemonic: str,
     :return: Wrapper class that overwrites the actual definition and contains static data
     """
     def wrapper(wrapped):
-        """Get wrapper"""
-        class WrappedClass(wrapped):  # pylint: disable=too-few-public-methods
-            """Generic wrapper class"""
+        wrapped.field_opcode = wrapped.field_opcode._replace(value=opcode)
+
+        wrapped.mnemonic = mnemonic
+        wrapped.variant = variant
 
-        WrappedClass.__name__ = wrapped.__name__
-        WrappedClass.__module__ = wrapped.__module__
-        WrappedClass.__qualname__ = wrapped.__qualname__
-        WrappedClass.__doc__ = wrapped.__doc__
-        return WrappedClass
+        for field, value in (("funct3", funct3), ("funct4", funct4), ("funct6", funct6)):
+            if value is None:
+                continue
+            fid = "field_"+field
+            assert fid in dir(wrapped), "Invalid field {} for {}".format(fid, wrapped.__name__)
+            setattr(wrapped, fid, getattr(wrapped, fid)._replace(value=value))
+        wrapped.update_fields()
+
+        wrapped.match = staticmethod(_gen_match(wrapped))
+
+        return wrapped
 
     return wrapper
 
@@ -785,20 +1249,33 @@ def isa_pseudo():
     TODO: documentation
     """
     def wrapper(wrapped):
-        class WrappedClass(wrapped):  # pylint: disable=too-few-public-methods
-            """
-            Wrapper class
-            """
+        wrapped._pseudo = True # pylint: disable=protected-access
+        return wrapped
 
-            _pseudo = True
+    return wrapper
 
-        WrappedClass.__name__ = wrapped.__name__
-        WrappedClass.__module__ = wrapped.__module__
-        WrappedClass.__qualname__ = wrapped.__qualname__
-        WrappedClass.__doc__ = wrapped.__doc__
-        return WrappedClass
 
-    return wrapper
+def _collect_insns(cls) -> list:
+    # Walk the class hierarchy depth-first in definition order. Classes with
+    # multiple instruction bases are only collected once.
+    insns = []
+    seen = set()
+    stack = [cls]
+    while stack:
+        icls = stack.pop()
+        if icls in seen:
+            continue
+        seen.add(icls)
+        # This filters out abstract classes
+        if icls.mnemonic:
+            insns.append(icls)
+        stack.extend(reversed(icls.__subclasses__()))
+    return insns
+
+
+def _variant_key(variant: Variant):
+    # Variants are not hashable, this identifies them in the caches
+    return None if variant is None else (variant.xlen, variant.baseint, frozenset(variant.extensions))
 
 
 def get_insns(*, cls=None, variant: Variant = RV32I):
@@ -811,21 +1288,88 @@ def get_insns(*, cls=None, variant: Variant = RV32I):
     :param cls: Base class to get list :type cls: Instruction :return: List of
     instruction classes
     """
-    insns = []
-
     if cls is None:
         cls = Instruction
 
-    # This filters out abstract classes
-    if cls.mnemonic:
-        if variant is None or cls.variant <= variant:
-            insns = [cls]
+    if cls not in _INSNS_CACHE:
+        _INSNS_CACHE[cls] = _collect_insns(cls)
 
-    for subcls in cls.__subclasses__():
-        insns += get_insns(cls=subcls, variant=variant)
+    key = (cls, _variant_key(variant))
+    if key not in _INSNS_CACHE:
+        _INSNS_CACHE[key] = [icls for icls in _INSNS_CACHE[cls] if variant is None or icls.variant <= variant]
+    return list(_INSNS_CACHE[key])
 
-    insns = list(dict.fromkeys(insns)) # Remove duplicates
-    return insns
+
+def get_decode_table(variant: Variant = None) -> dict:
+    """
+    Get the decode table of a variant. It maps the opcode, funct3 and funct7
+    bits of a machine code (`word & DECODE_MASK`) to the instruction class that
+    decodes it. Tables are built on first use and rebuilt when new instructions
+    are defined.
+
+    :param variant: Restrict to instructions of this variant
+    :return: Dictionary of decode bits to :class:`Instruction`
+    """
+    key = _variant_key(variant)
+    if key not in _DECODE_TABLES:
+        table = {}
+        for icls in get_insns(variant=variant):
+            if issubclass(icls, InstructionCType):
+                # Compressed instructions are matched separately
+                continue
+            static = _static_bits(icls)
+            if static is None:
+                # Cannot match any word
+                continue
+            mask, value = static
+            assert mask & ~DECODE_MASK == 0, "Static field outside of decode bits in {}".format(icls.__name__)
+            # Expand all don't-care decode bits of this instruction
+            free = DECODE_MASK & ~mask
+            sub = 0
+            while True:
+                table.setdefault(value | sub, icls)
+                sub = (sub - free) & free
+                if sub == 0:
+                    break
+        _DECODE_TABLES[key] = table
+    return _DECODE_TABLES[key]
+
+
+def get_compressed_decode_table(variant: Variant = None) -> dict:
+    """
+    Get the decode table of the compressed instructions of a variant. It maps
+    the opcode and funct3 bits of a compressed machine code
+    (`word & COMPRESSED_DECODE_MASK`) to a tuple of the instruction classes
+    that can match it.
+
+    :param variant: Restrict to instructions of this variant
+    :return: Dictionary of decode bits to tuple of :class:`InstructionCType`
+    """
+    key = _variant_key(variant)
+    if key not in _COMPRESSED_DECODE_TABLES:
+        table = {}
+        for icls in get_insns(cls=InstructionCType, variant=variant):
+            static = _static_bits(icls)
+            if static is None:
+                # Cannot match any word
+                continue
+            mask, value = static
+            assert mask & COMPRESSED_DECODE_MASK == COMPRESSED_DECODE_MASK, \
+                "Opcode or funct3 not static in {}".format(icls.__name__)
+            table.setdefault(value & COMPRESSED_DECODE_MASK, []).append(icls)
+        _COMPRESSED_DECODE_TABLES[key] = {bits: tuple(candidates) for bits, candidates in table.items()}
+    return _COMPRESSED_DECODE_TABLES[key]
+
+
+def decode_instruction(word: int, variant: Variant = None):
+    """
+    Find the instruction class that decodes a 32-bit machine code.
+
+    :param word: Machine code as 32-bit integer
+    :param variant: Restrict to instructions of this variant
+    :return: :class:`Instruction` that matches or None
+    """
+    return get_decode_table(variant).get(word & DECODE_MASK)
 
 
 def reverse_lookup(mnemonic: str, variant: Variant = None):
@@ -835,9 +1379,15 @@ def reverse_lookup(mnemonic: str, variant: Variant = None):
     :param mnemonic: Mnemonic to match
     :return: :class:`Instruction` that matches or None
     """
-    for i in get_insns(variant=variant):
-        if i.mnemonic == mnemonic:
-            return i
+    global _MNEMONIC_MAP # pylint: disable=global-statement
+    if _MNEMONIC_MAP is None:
+        _MNEMONIC_MAP = {}
+        for icls in get_insns(variant=None):
+            _MNEMONIC_MAP.setdefault(icls.mnemonic, []).append(icls)
+
+    for icls in _MNEMONIC_MAP.get(mnemonic, ()):
+        if variant is None or icls.variant <= variant:
+            return icls
 
     return None
 
@@ -1,4 +1,4 @@
-from random import randrange
+from random import getrandbits
 import sys
 
 from .variant import *
@@ -19,8 +19,7 @@ class State(object):
 
     def __init__(self, variant: Variant):
         self.variant = variant
-        intregs = 32 if variant.baseint == "I" else 16
-        self.intreg = RegisterFile(intregs, 32, {0: 0x0})
+        self.intreg = RegisterFile(variant.intregs, 32, {0: 0x0})
         self.pc = Register(32)
         self.pc_update = Register(32)
         self.memory = Memory()
@@ -46,11 +45,18 @@ class State(object):
     def reset(self, pc = 0):
         self.pc.set(pc)
 
+    def set_pc(self, pc):
+        """
+        Set the pc of the next instruction. Same as assigning to `pc`, without
+        going through __setattr__.
+        """
+        self.pc_update.set(pc)
+
     def __setattr__(self, key, value):
-        if key in self.single_regs and key in self.__dict__:
-            getattr(self, key).update(value)
-        elif key == "pc" and "pc_update" in self.__dict__:
+        if key == "pc" and "pc_update" in self.__dict__:
             self.pc_update.set(value)
+        elif key in self.single_regs and key in self.__dict__:
+            getattr(self, key).update(value)
         else:
             super().__setattr__(key, value)
 
@@ -69,58 +75,54 @@ class State(object):
         return address in self.reservations
 
 class Memory(object):
-    def __init__(self, *, base: int = 0, size: int = 2^32):
+    def __init__(self, *, base: int = 0, size: int = 1 << 32):
         self.base = base
         self.size = size
         self.memory = {}
         self.memory_updates = []
 
+    def _word(self, word):
+        # Uninitialized memory reads as random data, which then stays
+        data = self.memory.get(word)
+        if data is None:
+            data = self.memory[word] = getrandbits(32)
+        return data
+
     def lb(self, address):
-        word = address >> 2
-        offset = address % 4
-        if word not in self.memory:
-            self.memory[word] = randrange(0, 1 << 32)
-        return (self.memory[word] >> (offset*8)) & 0xff
+        return (self._word(address >> 2) >> ((address & 0x3) * 8)) & 0xff
 
     def lh(self, address):
-        word = address >> 2
-        offset = (address >> 1) % 2
-        if word not in self.memory:
-            self.memory[word] = randrange(0, 1 << 32)
-        return (self.memory[word] >> (offset*16)) & 0xffff
+        return (self._word(address >> 2) >> ((address & 0x2) * 8)) & 0xffff
 
     def lw(self, address):
-        word = address >> 2
-        if word not in self.memory:
-            self.memory[word] = randrange(0, 1 << 32)
-        return self.memory[word]
+        return self._word(address >> 2)
 
+    # Stores are buffered as (granularity, address, data) until commit(), the
+    # trace entries are only built by changes()
     def sb(self, address, data):
-        self.memory_updates.append(TraceMemory(TraceMemory.GRANULARITY.BYTE, address, int(data) & 0xFF))
+        self.memory_updates.append((TraceMemory.GRANULARITY.BYTE, address, int(data) & 0xFF))
 
     def sh(self, address, data):
-        self.memory_updates.append(TraceMemory(TraceMemory.GRANULARITY.HALFWORD, address, int(data) & 0xFFFF))
+        self.memory_updates.append((TraceMemory.GRANULARITY.HALFWORD, address, int(data) & 0xFFFF))
 
     def sw(self, address, data):
-        self.memory_updates.append(TraceMemory(TraceMemory.GRANULARITY.WORD, address, int(data) & 0xFFFFFFFF))
+        self.memory_updates.append((TraceMemory.GRANULARITY.WORD, address, int(data) & 0xFFFFFFFF))
 
     def changes(self):
-        return self.memory_updates
+        return [TraceMemory(gran, address, data) for gran, address, data in self.memory_updates]
 
     def commit(self):
-        for update in self.memory_updates:
-            address = update.addr
+        for gran, address, data in self.memory_updates:
             base = address >> 2
-            offset = address & 0x3
-            if base not in self.memory:
-                self.memory[base] = randrange(0, 1 << 32)
-            data = update.data
-            if update.gran == TraceMemory.GRANULARITY.BYTE:
-                mask = ~(0xFF << (offset*8)) & 0xFFFFFFFF
-                data = (self.memory[base] & mask) | (data << (offset*8))
+            if gran is TraceMemory.GRANULARITY.BYTE:
+                shift = (address & 0x3) * 8
+                data = (self._word(base) & ~(0xFF << shift)) | (data << shift)
+            elif gran is TraceMemory.GRANULARITY.HALFWORD:
+                shift = (address & 0x2) * 8
+                data = (self._word(base) & ~(0xFFFF << shift)) | (data << shift)
             self.memory[base] = data
 
-        self.memory_updates = []
+        self.memory_updates.clear()
 
 class Environment:
     def call(self, state: State):
@@ -136,14 +138,14 @@ class Model(object):
         self.asm_tpl = "{{:{}}} | [{{}}]\n".format(asm_width)
 
     def issue(self, insn):
-        self.state.pc += 4
-        expected_pc = self.state.pc
+        state = self.state
+        state.pc_update.set(state.pc.value + 4)
         insn.execute(self)
 
-        trace = self.state.changes()
+        trace = state.changes()
         if self.verbose is not False:
             self.verbose_file.write(self.asm_tpl.format(str(insn), ", ".join([str(t) for t in trace])))
-        self.state.commit()
+        state.commit()
         return trace
 
     def execute(self, insn):
@@ -153,8 +155,19 @@ class Model(object):
             insn = [insn]
 
         try:
-            for i in insn:
-                self.issue(i)
+            if self.verbose is not False:
+                for i in insn:
+                    self.issue(i)
+            else:
+                # Same as issue(), but the trace is not needed here
+                state = self.state
+                pc = state.pc
+                pc_update = state.pc_update
+                commit = state.commit
+                for i in insn:
+                    pc_update.set(pc.value + 4)
+                    i.execute(self)
+                    commit()
         except TerminateException as ex:
             assert ex.returncode == 0
 
@@ -1,7 +1,10 @@
 import random
 import argparse
+import multiprocessing
+import os
 import sys
-from tempfile import mkstemp
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
 import subprocess
 
 from .insn import *
@@ -16,17 +19,73 @@ def random_instruction(variant: Variant, pool = None):
     if pool is None:
         pool = get_insns()
 
+    choice = random.choice
     while True:
-        c = random.choice(pool)
-        i = c()
+        i = choice(pool)()
         i.randomize(variant)
         yield i
 
 
-def random_asm(N, pool=None):
+def random_asm(N, pool=None, weights=None):
+    """
+    Generate a sequence of random instructions
+
+    :param N: Number of instructions
+    :param pool: Instruction classes to choose from, all instructions by default
+    :param weights: Relative weights of the classes in the pool, uniform by default
+    """
     v = RV32I
-    for i in range(N):
-        yield next(random_instruction(v, pool=pool))
+    if pool is None:
+        pool = get_insns()
+
+    # Draw the instructions of the whole sequence at once
+    for c in random.choices(pool, weights=weights, k=N):
+        i = c()
+        i.randomize(v)
+        yield i
+
+
+def _random_asm_lines(args):
+    N, pool, seed = args
+    random.seed(seed)
+    return [str(i) for i in random_asm(N, pool)]
+
+
+# Number of parts of a sequence generated in parallel. It is independent of the
+# number of processes, so that a seed always produces the same sequence.
+PARALLEL_CHUNKS = 64
+
+
+def random_asm_parallel(N, pool=None, workers=None, seed=None):
+    """
+    Generate a sequence of random instructions in parallel processes. The
+    sequence is split into a fixed number of parts, each generated with its own
+    seed, which are derived from the given seed.
+
+    :param N: Number of instructions
+    :param pool: Instruction classes to choose from, all instructions by default
+    :param workers: Number of processes, the number of CPUs by default
+    :param seed: Seed for reproducible sequences, drawn from :mod:`random` by default
+    :return: List of the instructions in assembler syntax
+    """
+    if pool is None:
+        pool = get_insns()
+    if seed is None:
+        seed = random.getrandbits(64)
+    rng = random.Random(seed)
+    jobs = [(N // PARALLEL_CHUNKS + (1 if c < N % PARALLEL_CHUNKS else 0), pool, rng.getrandbits(64))
+            for c in range(PARALLEL_CHUNKS)]
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        # Generate in this process, the seeds of the parts must not change
+        # the state of random for the caller
+        state = random.getstate()
+        parts = [_random_asm_lines(job) for job in jobs]
+        random.setstate(state)
+    else:
+        with multiprocessing.Pool(workers) as p:
+            parts = p.map(_random_asm_lines, jobs)
+    return [line for part in parts for line in part]
 
 
 def gen_asm_parser():
@@ -34,6 +93,8 @@ def gen_asm_parser():
     parser.add_argument('N', nargs='?', default=10, type=int, help='Number of assembler instructions')
     parser.add_argument('-v', '--variant', default='RV32I', help='Restrict to variant')
     parser.add_argument('-i', '--instruction', action='append', type=str, help='Restrict to instructions')
+    parser.add_argument('--seed', type=int, help='Seed for a reproducible sequence')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of processes that generate the sequence')
     parser.add_argument('--version', help='Display version', action='version', version=__version__)
     return parser
 
@@ -59,43 +120,61 @@ def gen_asm(argv=None):
         print("No instructions can be generated with the given contraints")
         return
 
-    for asm in random_asm(args.N, pool=pool):
-        print(asm)
+    # A seeded sequence is always generated in parts, so that it only depends
+    # on the seed and the number of instructions
+    if args.seed is not None or args.jobs > 1:
+        asms = random_asm_parallel(args.N, pool=pool, workers=args.jobs, seed=args.seed)
+    else:
+        asms = random_asm(args.N, pool=pool)
+    # Write the whole sequence at once
+    sys.stdout.write("".join("{}\n".format(asm) for asm in asms))
 
 def check_asm_run(N, pool, compiler, objcopy):
-    print("Check {} instructions from {}".format(N, [i.mnemonic for i in pool]))
-
-    scoreboard = []
-
-    asm = mkstemp(suffix='.S')
-    objfile = mkstemp(suffix='.o')
-    f = open(asm[1], "w")
-    for a in random_asm(N, pool):
-        scoreboard.append(a)
-        f.write("{}\n".format(str(a)))
-    f.close()
-
-    subprocess.call([compiler, '-o', objfile[1], '-c', asm[1]])
-
-    binfile = mkstemp(suffix='.bin')
-    subprocess.call([objcopy, '-O', 'binary', objfile[1], binfile[1]])
-
-    j = 0
-    for i in read_from_binary(binfile[1]):
-        if str(i) != str(scoreboard[j]):
-            print("Check failed: {} {}".format(N, [i.mnemonic for i in pool]))
-            print("{} != {}".format(i, scoreboard[j]))
-            return
-
-        j += 1
-    print("Check passed: {} {}".format(N, [i.mnemonic for i in pool]))
+    """
+    Check that random instructions from the pool assemble and disassemble to
+    the same assembler code.
+
+    :param N: Number of instructions
+    :param pool: Instruction classes to choose from
+    :param compiler: Compiler executable
+    :param objcopy: objcopy executable
+    :return: Tuple of whether the check passed and the lines of its report
+    """
+    mnemonics = [i.mnemonic for i in pool]
+    report = ["Check {} instructions from {}".format(N, mnemonics)]
+
+    # Keep the assembly, so that each instruction is only disassembled once
+    scoreboard = [str(a) for a in random_asm(N, pool)]
+
+    with TemporaryDirectory() as tmpdir:
+        asm = os.path.join(tmpdir, "check.S")
+        objfile = os.path.join(tmpdir, "check.o")
+        binfile = os.path.join(tmpdir, "check.bin")
+        with open(asm, "w") as f:
+            f.write("".join("{}\n".format(line) for line in scoreboard))
+
+        subprocess.call([compiler, '-o', objfile, '-c', asm])
+        subprocess.call([objcopy, '-O', 'binary', objfile, binfile])
+
+        j = 0
+        for i in read_from_binary(binfile):
+            if str(i) != scoreboard[j]:
+                report.append("Check failed: {} {}".format(N, mnemonics))
+                report.append("{} != {}".format(i, scoreboard[j]))
+                return False, report
+
+            j += 1
+    report.append("Check passed: {} {}".format(N, mnemonics))
+    return True, report
 
 
 def check_asm(argv=None):
+    mnemonics = get_mnemomics()
     parser = argparse.ArgumentParser(description='Automatically test if sequences of assembler instructions compile.')
     parser.add_argument('N', nargs='?', default=100, type=int, help='Number of assembler instructions')
-    parser.add_argument('-i', action='append', type=str, choices=get_mnemomics(), help='Restrict to instructions')
+    parser.add_argument('-i', action='append', type=str, choices=mnemonics, help='Restrict to instructions')
     parser.add_argument('-s', action='store_true', default=False, help='Test each mnemonic individually')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of mnemonics tested in parallel with -s')
     parser.add_argument('--cc', type=str, default="riscv32-unknown-elf-gcc", help='Compiler executable')
     parser.add_argument('--objcopy', type=str, default="riscv32-unknown-elf-objcopy", help='objcopy executable')
     parser.add_argument('--version', help='Display version', action='version', version=__version__)
@@ -105,15 +184,27 @@ def check_asm(argv=None):
     args = parser.parse_args(argv)
 
     if args.i is None:
-        args.i = get_mnemomics()
+        args.i = mnemonics
 
     pool = [reverse_lookup(m) for m in args.i]
 
     if (args.s):
-        for i in pool:
-            check_asm_run(args.N, [i], args.cc, args.objcopy)
+        # The checks are independent and mostly wait for the compiler, run
+        # them concurrently. The reports are printed here in order, so that
+        # they do not interleave.
+        passed = True
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [executor.submit(check_asm_run, args.N, [i], args.cc, args.objcopy) for i in pool]
+            for future in futures:
+                result, report = future.result()
+                print("\n".join(report))
+                passed = passed and result
     else:
-        check_asm_run(args.N, pool, args.cc, args.objcopy)
+        passed, report = check_asm_run(args.N, pool, args.cc, args.objcopy)
+        print("\n".join(report))
+
+    if not passed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -33,7 +33,13 @@ x30 = 30
 x31 = 31
 
 
+# Register names are formatted once
+_REGNAMES = tuple("x{}".format(r) for r in range(32))
+
+
 def regname(r: int):
+    if 0 <= r < len(_REGNAMES):
+        return _REGNAMES[r]
     return "x{}".format(r)
 
 
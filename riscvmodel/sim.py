@@ -1,38 +1,68 @@
 from .model import Model, Memory, TerminateException
+from .code import decode
+from .insn import InstructionNOP
 
 import struct
 
+# The canonical nop (addi x0, x0, 0) is common in machine code, it is shared
+# by all occurrences in a program
+NOP = InstructionNOP()
+NOP_WORD = NOP.encode()
+
 class Simulator:
   def __init__(self, model):
     self.model = model
     self.program = []
 
   def load_program(self, program, *, address=0):
+    """
+    Load the program. It is a sequence of instructions, either decoded or as
+    machine code words, which are decoded once when first executed.
+    """
     self.program = [i for i in program]
 
-  def load_data(self, data = "", *, address=0):
+  def load_data(self, data = b"", *, address=0):
     mem = self.model.state.memory.memory
-    for a in range(int(len(data)/4)):
-      mem[a] = struct.unpack("<L", data[a*4:(a+1)*4])[0]
+    # Trailing bytes that do not fill a word are ignored
+    full = len(data) & ~3
+    mem.update(enumerate(word for word, in struct.iter_unpack("<L", data[:full])))
 
   def run(self, *, pc=0):
     self.model.reset(pc=pc)
     cnt = 0
-    while True:
-      try:
-        self.model.issue(self.program[int(self.model.state.pc)>>2])
+    # Bind the dispatch path once, the loop runs for every instruction
+    model = self.model
+    issue = model.issue
+    program = self.program
+    pc = model.state.pc
+    pc_update = model.state.pc_update
+    commit = model.state.commit
+    variant = model.state.variant
+    # Without verbose output the trace is not needed, the steps of issue() are
+    # done inline then
+    trace = model.verbose is not False
+    size = len(program)
+    try:
+      while True:
+        index = pc.value >> 2
+        # The program ends when the pc leaves it
+        if not 0 <= index < size:
+          return cnt
+        insn = program[index]
+        if insn.__class__ is int:
+          insn = program[index] = NOP if insn == NOP_WORD else decode(insn, variant)
+        if trace:
+          issue(insn)
+        else:
+          pc_update.set(pc.value + 4)
+          insn.execute(model)
+          commit()
         cnt += 1
-      except TerminateException as exc:
-        assert exc.returncode == 0
-        return cnt
-      except IndexError as exc:
-        return cnt
-    return cnt
+    except TerminateException as exc:
+      assert exc.returncode == 0
+      return cnt
 
   def dump_data(self, *, address=0, size=None):
-    data = b""
     mem = self.model.state.memory.memory
-    for a in mem:
-      if a >= address and (size is None or a < address + size):
-        data += struct.pack("<L", mem[a])
-    return data
+    words = [mem[a] for a in mem if a >= address and (size is None or a < address + size)]
+    return struct.pack("<{}L".format(len(words)), *words)
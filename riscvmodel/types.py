@@ -1,6 +1,7 @@
-from random import randint
+from random import randint, getrandbits
 from enum import Enum
 from collections import namedtuple
+import struct
 
 
 class InvalidImmediateException(Exception):
@@ -26,8 +27,17 @@ class Immediate(object):
         self.signed = signed
         self.lsb0 = lsb0
         self.value = 0
-        self.tcmask = 1 << (self.bits - 1) # mask used for two's complement
-        self.mask = (1 << self.bits) - 1
+        self.tcmask = 1 << (bits - 1) # mask used for two's complement
+        self.mask = (1 << bits) - 1
+        self.lsb0mask = ~1 if lsb0 else -1
+        # Bounds are derived here directly, constructing immediates is on the
+        # hot path of decoding
+        if signed:
+            self.minimum = -self.tcmask
+            self.maximum = (self.tcmask - 1) & self.lsb0mask
+        else:
+            self.minimum = 0
+            self.maximum = self.mask & self.lsb0mask
         if init is not None:
             self.set(init)
 
@@ -71,13 +81,15 @@ class Immediate(object):
 
         :raises InvalidImmediateException: value does not match immediate
         """
-        if not isinstance(value, int):
-            raise self.exception("{} is not an integer".format(value))
-        if self.lsb0 and self.value % 2 == 1:
-            raise self.exception("{} not power of two".format(value))
-        if not self.signed and value < 0:
-            raise self.exception("{} cannot be negative".format(value))
-        if value < self.min() or value > self.max():
+        # Valid values are in [minimum, minimum + 2**bits) and aligned if lsb0
+        if not (isinstance(value, int) and (value - self.minimum) & ~self.mask == 0
+                and not (self.lsb0 and value & 1)):
+            if not isinstance(value, int):
+                raise self.exception("{} is not an integer".format(value))
+            if self.lsb0 and value & 1:
+                raise self.exception("{} not power of two".format(value))
+            if not self.signed and value < 0:
+                raise self.exception("{} cannot be negative".format(value))
             raise self.exception("{} not in allowed range {}-{}".format(value, self.min(), self.max()))
 
         self.value = value
@@ -91,16 +103,36 @@ class Immediate(object):
         :type value: int
         """
         if self.signed:
-            value = -(value & self.tcmask) + (value & ~self.tcmask)
-        self.set(value)
+            value = (value ^ self.tcmask) - self.tcmask
+        if (value - self.minimum) & ~self.mask == 0 and not (self.lsb0 and value & 1):
+            self.value = value
+        else:
+            # Let set() raise the matching exception
+            self.set(value)
 
     def randomize(self):
         """
         Randomize this immediate to a legal value
         """
-        self.value = randint(self.min(), self.max())
-        if self.lsb0:
-            self.value = self.value - (self.value % 2)
+        self.value = randint(self.minimum, self.maximum) & self.lsb0mask
+
+    def random_batch(self, count: int) -> list:
+        """
+        Draw legal values for this immediate. All values are taken from the
+        bytes of a single random number.
+
+        :param count: Number of values
+        :return: List of values
+        """
+        if count == 0:
+            return []
+        assert self.bits <= 32
+        # Standard size little endian words, independent of the platform
+        data = struct.unpack("<{}L".format(count), getrandbits(32 * count).to_bytes(4 * count, "little"))
+        mask = self.mask & self.lsb0mask
+        if self.signed:
+            return [((value & mask) ^ self.tcmask) - self.tcmask for value in data]
+        return [value & mask for value in data]
 
     def __int__(self):
         """Convert to int"""
@@ -133,12 +165,20 @@ class Immediate(object):
             return self.value == other.value
 
 
+# Format strings of registers by width
+_REGISTER_FORMATS = {}
+
+
 class Register(object):
+    __slots__ = ("bits", "immutable", "value", "format", "mask")
+
     def __init__(self, bits: int):
         self.bits = bits
         self.immutable = False
         self.value = 0
-        self.format = "{{:0{}x}}".format(int(bits/4))
+        self.format = _REGISTER_FORMATS.get(bits)
+        if self.format is None:
+            self.format = _REGISTER_FORMATS[bits] = "{{:0{}x}}".format(int(bits/4))
         self.mask = (1 << bits) - 1
 
     def set_immutable(self, s: bool):
@@ -149,14 +189,16 @@ class Register(object):
             self.value = randint(0, 1 << self.bits - 1)
 
     def set(self, value):
-        if isinstance(value, (Register, Immediate)):
+        # Most values are plain integers, only check for other types then
+        if value.__class__ is not int and isinstance(value, (Register, Immediate)):
             value = value.value
-        if not self.immutable:
-            self.value = value
-        if (self.value >> (self.bits - 1)) & 1 != 0:
-            self.value |= ~self.mask
-        else:
-            self.value &= self.mask
+        if self.immutable:
+            value = self.value
+        # Store sign extended
+        value &= self.mask
+        if value >> (self.bits - 1):
+            value -= self.mask + 1
+        self.value = value
 
     def __int__(self):
         return self.value
@@ -262,20 +304,27 @@ class RegisterFile(object):
 
     def __setitem__(self, key, value):
         if not self.regs[key].immutable:
-            reg = Register(self.bits)
-            reg.set(value)
-            self.regs_updates.append(TraceIntegerRegister(key, reg, prefix=self.prefix, width=self.bits))
+            # Updates are kept as plain values, the trace is only built by changes()
+            if value.__class__ is not int:
+                value = int(value)
+            self.regs_updates.append((key, value))
 
     def __getitem__(self, item):
         return self.regs[item]
 
     def commit(self):
-        for t in self.regs_updates:
-            self.regs[t.id].set(t.value)
+        regs = self.regs
+        for key, value in self.regs_updates:
+            regs[key].set(value)
         self.regs_updates.clear()
 
     def changes(self) -> list:
-        return self.regs_updates.copy()
+        changes = []
+        for key, value in self.regs_updates:
+            reg = Register(self.bits)
+            reg.set(value)
+            changes.append(TraceIntegerRegister(key, reg, prefix=self.prefix, width=self.bits))
+        return changes
 
     def __str__(self):
         return "{}".format([str(r) for r in self.regs])
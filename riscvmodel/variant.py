@@ -8,6 +8,7 @@ TODO: Description
 import argparse
 import re
 from collections import namedtuple
+from functools import lru_cache
 
 Extension = namedtuple("Extension", ["name", "description", "implies"])
 
@@ -37,31 +38,11 @@ class Variant:
         for ext in custext or []:
             self.custext[ext.name] = ext
         self.name = name
-        match = self.regex.match(name.upper())
-        assert match, "Invalid variant string '{}'".format(name)
-        self.extensions = set()
-        self.xlen = int(match.group(1))
-        self.baseint = match.group(2)
-        if self.baseint == "G":
-            self.extensions |= set(Variant.G_expand)
-            self.baseint = "I"
-        assert (self.baseint == "I"
-                or self.xlen == 32), "E base integer is only valid for 32-bit"
-        if match.group(3):
-            for ext in match.group(3):
-                if ext == "G":
-                    assert (self.baseint == "I"), "G is not defined for I"
-                    self.extensions |= set(Variant.G_expand)
-                else:
-                    self.extensions |= set([ext] + Variant.stdext[ext].implies)
-        if match.group(4):
-            for ext in match.group(4).split("_"):
-                if ext[0] == "Z":
-                    self.extensions |= set(
-                        [ext[0]+ext[1:].lower()] + Variant.stdextZ["Z" + ext[1:].lower()].implies)
-                elif ext[0] == "X":
-                    self.extensions |= set(
-                        [ext[0]+ext[1:].lower()] + self.custext["X" + ext[1:].lower()].implies)
+        custimplies = tuple((ext.name, tuple(ext.implies)) for ext in self.custext.values())
+        self.xlen, self.baseint, extensions = _parse_variant(name.upper(), custimplies)
+        # Copy, the extensions of a variant can be extended
+        self.extensions = set(extensions)
+        self.intregs = 16 if self.baseint == "E" else 32
 
     def __str__(self):
         return self.name
@@ -72,7 +53,7 @@ class Variant:
         '''
         desc = self.name + "\n"
         desc += "  XLEN={}, {} integer registers ({})\n".format(
-            self.xlen, "16" if self.baseint == "E" else "32", self.baseint)
+            self.xlen, self.intregs, self.baseint)
         desc += "  Extensions:\n"
         if len(self.extensions) == 0:
             desc += "    None\n"
@@ -116,12 +97,49 @@ class Variant:
                               list), "Requires Extension or list of Extension"
             for ext in other:
                 self.custext[ext.name] = ext
-                self.extensions.add(ext.name)
-                for i in ext.implies:
-                    self.extensions.add(i)
+                self.extensions.update([ext.name], ext.implies)
         return self
 
 
+@lru_cache(maxsize=None)
+def _parse_variant(name: str, custimplies: tuple) -> tuple:
+    """
+    Parse a variant string. The result is cached, variants are mostly created
+    from a few names.
+
+    :param name: Variant string in upper case
+    :param custimplies: Tuple of (name, implied extensions) of the custom extensions
+    :return: Tuple of xlen, base integer ISA and frozenset of extensions
+    """
+    custext = dict(custimplies)
+    match = Variant.regex.match(name)
+    assert match, "Invalid variant string '{}'".format(name)
+    extensions = set()
+    xlen = int(match.group(1))
+    baseint = match.group(2)
+    if baseint == "G":
+        extensions |= set(Variant.G_expand)
+        baseint = "I"
+    assert (baseint == "I"
+            or xlen == 32), "E base integer is only valid for 32-bit"
+    if match.group(3):
+        for ext in match.group(3):
+            if ext == "G":
+                assert (baseint == "I"), "G is not defined for I"
+                extensions |= set(Variant.G_expand)
+            else:
+                extensions |= set([ext] + Variant.stdext[ext].implies)
+    if match.group(4):
+        for ext in match.group(4).split("_"):
+            if ext[0] == "Z":
+                extensions |= set(
+                    [ext[0]+ext[1:].lower()] + Variant.stdextZ["Z" + ext[1:].lower()].implies)
+            elif ext[0] == "X":
+                extensions |= set(
+                    [ext[0]+ext[1:].lower()] + list(custext["X" + ext[1:].lower()]))
+    return xlen, baseint, frozenset(extensions)
+
+
 # Convenience
 RV32I = Variant("RV32I")
 RV32E = Variant("RV32E")
@@ -0,0 +1,67 @@
+from riscvmodel.code import decode, decode_batch, decode_buffer, read_from_binary, InstructionBuffer, MachineDecodeError
+from riscvmodel.insn import *
+from riscvmodel.variant import RV32I, RV32IC
+
+import pytest
+
+
+def test_decode_addi():
+    insn = decode(0x00a00093)
+    assert isinstance(insn, InstructionADDI)
+    assert str(insn) == "addi x1, x0, 10"
+
+
+def test_decode_roundtrip():
+    """Decode the encoding of each randomized RV32I instruction"""
+    for icls in get_insns(variant=RV32I):
+        if icls.mnemonic in ["ecall", "ebreak", "uret", "sret", "hret", "mret", "wfi"]:
+            continue
+        if icls.__name__ == "InstructionNOP":
+            continue
+        insn = icls()
+        insn.randomize(RV32I)
+        assert str(decode(insn.encode())) == str(insn)
+
+
+def test_decode_variant():
+    """fence.i is not part of RV32I"""
+    with pytest.raises(MachineDecodeError):
+        decode(0x0000100f, RV32I)
+    assert isinstance(decode(0x0000100f, None), InstructionFENCEI)
+
+
+def test_decode_batch():
+    words = [0x00a00093, 0x00208133, 0x00a00093]
+    assert [str(i) for i in decode_batch(words)] == [str(decode(w)) for w in words]
+    with pytest.raises(MachineDecodeError):
+        decode_batch([0x0000100f], RV32I)
+
+
+def test_decode_buffer():
+    buf = bytes.fromhex("93 00 a0 00 33 81 20 00")
+    assert [str(i) for i in decode_buffer(buf)] == ["addi x1, x0, 10", "add x2, x1, x2"]
+
+
+def test_read_from_binary(tmp_path):
+    fname = tmp_path / "prog.bin"
+    fname.write_bytes(bytes.fromhex("93 00 a0 00 33 81 20 00 0f 10 00 00"))
+    assert [str(i) for i in read_from_binary(str(fname), stoponerror=True)] == ["addi x1, x0, 10", "add x2, x1, x2"]
+    with pytest.raises(MachineDecodeError):
+        list(read_from_binary(str(fname)))
+
+
+def test_instruction_buffer():
+    ibuf = InstructionBuffer.from_buffer(bytes.fromhex("93003100b3812000"))
+    ibuf.append(InstructionSUB(4, 3, 1))
+    assert len(ibuf) == 3
+    assert str(ibuf[1]) == "add x3, x1, x2"
+    assert [str(i) for i in ibuf] == ["addi x1, x2, 3", "add x3, x1, x2", "sub x4, x3, x1"]
+    assert ibuf.classes() == [InstructionADDI, InstructionADD, InstructionSUB]
+
+
+def test_decode_compressed():
+    assert str(decode(0x4095, RV32IC)) == "c.li x1, 5"
+    assert str(decode(0x1135, RV32IC)) == "c.addi x2, -19"
+    assert str(decode(0x8506, RV32IC)) == "c.mv x10, x1"
+    with pytest.raises(MachineDecodeError):
+        decode(0x4095, RV32I)
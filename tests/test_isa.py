@@ -0,0 +1,122 @@
+from riscvmodel.insn import *
+from riscvmodel.random import random_asm, random_asm_parallel
+from riscvmodel.variant import RV32I, RV32E
+
+import pytest
+import random
+
+
+def test_random_batch():
+    insns = InstructionBEQ.random_batch(RV32I, 100)
+    assert len(insns) == 100
+    for insn in insns:
+        assert isinstance(insn, InstructionBEQ)
+        assert 0 <= insn.rs1 < 32 and 0 <= insn.rs2 < 32
+        assert -4096 <= int(insn.imm) <= 4094 and int(insn.imm) % 2 == 0
+
+
+def test_random_batch_variant():
+    for insn in InstructionADD.random_batch(RV32E, 100):
+        assert max(insn.rd, insn.rs1, insn.rs2) < 16
+
+
+def test_field_parts():
+    field = InstructionJAL.field_imm
+    assert field.parts == ((21, 10, 1), (20, 1, 11), (12, 8, 12), (31, 1, 20))
+    assert InstructionJAL.extract_field("imm", 0x80000000) == 1 << 20
+    assert field._replace(value=3).value == 3 and field.value is None
+
+
+def test_generated_encode():
+    from riscvmodel.isa import Instruction, get_insns
+    for icls in get_insns(variant=RV32I):
+        for insn in icls.random_batch(RV32I, 10):
+            assert insn.encode() == Instruction.encode(insn)
+
+
+def test_immediate_readonly():
+    insn = InstructionADDI(1, 2, 3)
+    with pytest.raises(AttributeError):
+        insn.imm = 4
+    insn.imm.set(4)
+    assert insn.imm == 4 and insn.rd == 1
+
+
+def test_equality():
+    assert InstructionADDI(1, 2, 3) == InstructionADDI(1, 2, 3)
+    assert InstructionADDI(1, 2, 3) != InstructionADDI(1, 2, 4)
+    assert InstructionADD(1, 2, 3) != InstructionSUB(1, 2, 3)
+    assert len({InstructionADD(1, 2, 3), InstructionADD(1, 2, 3)}) == 1
+
+
+def test_equality_compressed():
+    assert InstructionCADDI(1, 5) == InstructionCADDI(1, 5)
+    assert InstructionCADDI(1, 5) != InstructionCADDI(2, 7)
+    assert InstructionCMV(1, 2) != InstructionCMV(3, 4)
+    assert len({InstructionCMV(1, 2), InstructionCMV(3, 4), InstructionCMV(1, 2)}) == 2
+
+
+def test_equality_unset():
+    insn = InstructionADD()
+    assert insn == insn
+    assert InstructionADD() != InstructionADD()
+    assert InstructionADD() != InstructionADD(1, 2, 3)
+    assert InstructionECALL() == InstructionECALL()
+
+
+def test_hash():
+    assert hash(InstructionADDI(1, 2, 3)) == hash(InstructionADDI(1, 2, 3))
+    assert len({InstructionADDI(1, 2, 3), InstructionADDI(1, 2, 3), InstructionADDI(1, 2, 4)}) == 2
+    assert len({InstructionCADDI(1, 3), InstructionCADDI(1, 3)}) == 1
+
+
+def test_ops_from_string():
+    insn = InstructionADDI()
+    insn.ops_from_string("x1,x2,-0x10")
+    assert str(insn) == "addi x1, x2, -16"
+    insn = InstructionLW()
+    insn.ops_from_string("x1,8,x2")
+    assert str(insn) == "lw x1, 8(x2)"
+
+
+def test_random_asm():
+    pool = [InstructionADD, InstructionADDI]
+    insns = list(random_asm(50, pool))
+    assert len(insns) == 50
+    assert all(type(i) in pool for i in insns)
+    insns = list(random_asm(20, pool, weights=[0, 1]))
+    assert all(isinstance(i, InstructionADDI) for i in insns)
+
+
+def test_random_asm_parallel():
+    pool = [InstructionADD, InstructionADDI]
+    lines = random_asm_parallel(101, pool, workers=2, seed=1)
+    assert len(lines) == 101
+    assert all(line.split()[0] in ("add", "addi") for line in lines)
+    assert random_asm_parallel(101, pool, workers=3, seed=1) == lines
+    random.seed(2)
+    lines = random_asm_parallel(101, pool, workers=2)
+    random.seed(2)
+    assert random_asm_parallel(101, pool, workers=1) == lines
+    random.seed(3)
+    random_asm_parallel(101, pool, workers=1, seed=1)
+    assert random.random() == random.Random(3).random()
+
+
+def test_isa_required_init():
+    from riscvmodel.isa import isa, InstructionIType
+    from riscvmodel.variant import Variant, Extension
+
+    xtest = Variant("RV32IXtest", custext=[Extension("Xtest", "Test extension", [])])
+
+    @isa("test.addi", xtest, opcode=0b0001011, funct3=0b000)
+    class InstructionTESTADDI(InstructionIType):
+        def __init__(self, rd: int, rs1: int, imm: int):
+            super().__init__(rd, rs1, imm)
+
+    insn = InstructionTESTADDI(1, 2, -3)
+    assert InstructionTESTADDI.encode.generated
+    word = insn.encode()
+    decoded = InstructionTESTADDI(0, 0, 0)
+    decoded.decode(word)
+    assert decoded == insn and decoded.imm == -3
@@ -1,6 +1,8 @@
 from riscvmodel.program.tests import *
 from riscvmodel.program.tests_atomic import *
+from riscvmodel.insn import *
 from riscvmodel.model import Model
+from riscvmodel.sim import Simulator
 from riscvmodel.variant import RV32I, RV32A
 
 import pytest
@@ -29,4 +31,182 @@ def test_model_lr_sc():
     pgm = LRSCTest()
     m   = Model(RV32A)
     m.execute(pgm)
-    check_model(m, pgm.expects())
\ No newline at end of file
+    check_model(m, pgm.expects())
+
+def test_simulator_loop():
+    """Run a counting loop in the simulator"""
+    m = Model(RV32I)
+    sim = Simulator(m)
+    sim.load_program([
+        InstructionADDI(1, 0, 10),
+        InstructionADD(2, 2, 1),
+        InstructionADDI(1, 1, -1),
+        InstructionBNE(1, 0, -8),
+    ])
+    assert sim.run() == 31
+    check_model(m, {1: 0, 2: 55})
+
+
+def test_simulator_machine_code():
+    """Run a program given as machine code, which is decoded on first use"""
+    m = Model(RV32I)
+    sim = Simulator(m)
+    sim.load_program([0x00a00093, 0x00110133, 0xfff08093, 0xfe009ce3])
+    assert sim.run() == 31
+    check_model(m, {1: 0, 2: 55})
+    assert isinstance(sim.program[1], InstructionADD)
+
+
+def test_simulator_nop():
+    m = Model(RV32I)
+    sim = Simulator(m)
+    sim.load_program([0x00000013, 0x00a00093, 0x00000013])
+    assert sim.run() == 3
+    check_model(m, {1: 10})
+    assert isinstance(sim.program[0], InstructionNOP)
+    assert sim.program[0] is sim.program[2]
+
+
+def test_model_set_less_than():
+    m = Model(RV32I)
+    m.execute([
+        InstructionADDI(1, 0, -1),
+        InstructionADDI(2, 0, 5),
+        InstructionSLTU(3, 2, 1),
+        InstructionSLTU(4, 1, 2),
+        InstructionSLT(5, 1, 2),
+        InstructionSLTIU(6, 2, -1),
+        InstructionSLTIU(7, 1, 3),
+        InstructionSLTI(8, 1, 0),
+    ])
+    check_model(m, {3: 1, 4: 0, 5: 1, 6: 1, 7: 0, 8: 1})
+
+
+def test_model_shifts():
+    m = Model(RV32I)
+    m.execute([
+        InstructionADDI(1, 0, -16),
+        InstructionADDI(2, 0, 2),
+        InstructionSRAI(3, 1, 2),
+        InstructionSRLI(4, 1, 28),
+        InstructionSRA(5, 1, 2),
+        InstructionSRL(6, 1, 2),
+        InstructionSLLI(7, 2, 31),
+    ])
+    check_model(m, {3: 0xfffffffc, 4: 0xf, 5: 0xfffffffc, 6: 0x3ffffffc, 7: 0})
+
+
+def test_model_load_sign_extension():
+    m = Model(RV32I)
+    m.state.memory.memory[0] = 0x7f80ff01
+    m.execute([
+        InstructionLB(1, 0, 0),
+        InstructionLB(2, 0, 1),
+        InstructionLH(3, 0, 0),
+        InstructionLH(4, 0, 2),
+        InstructionLBU(5, 0, 1),
+    ])
+    check_model(m, {1: 1, 2: 0xffffffff, 3: 0xffffff01, 4: 0x7f80, 5: 0xff})
+
+
+def test_model_load_store_address():
+    m = Model(RV32I)
+    m.execute([
+        InstructionADDI(1, 0, 16),
+        InstructionADDI(2, 0, -2),
+        InstructionSW(1, 2, -8),
+        InstructionLW(3, 1, -8),
+        InstructionLBU(4, 1, -7),
+        InstructionLW(5, 0, 8),
+    ])
+    check_model(m, {3: 0xfffffffe, 4: 0xff, 5: 0xfffffffe})
+
+
+def test_model_partial_stores():
+    m = Model(RV32I)
+    m.state.memory.memory[0] = 0x11223344
+    m.execute([
+        InstructionADDI(1, 0, 0x55),
+        InstructionSB(0, 1, 1),
+        InstructionSH(0, 1, 2),
+        InstructionLW(2, 0, 0),
+    ])
+    check_model(m, {2: 0x00555544})
+
+
+def test_simulator_jumps():
+    m = Model(RV32I)
+    sim = Simulator(m)
+    sim.load_program([
+        InstructionJAL(1, 8),
+        InstructionADDI(3, 0, 1),
+        InstructionADDI(2, 0, 21),
+        InstructionJALR(4, 2, 0),
+        InstructionADDI(5, 0, 1),
+        InstructionADDI(6, 0, 1),
+    ])
+    sim.run()
+    check_model(m, {1: 4, 2: 21, 3: 0, 4: 16, 5: 0, 6: 1})
+
+
+def test_model_branches():
+    m = Model(RV32I)
+    m.state.intreg[1] = -1
+    m.state.intreg[2] = 1
+    m.state.intreg.commit()
+    for insn, taken in [(InstructionBEQ(1, 2, 8), False), (InstructionBNE(1, 2, 8), True),
+                        (InstructionBLT(1, 2, 8), True), (InstructionBGE(1, 2, 8), False),
+                        (InstructionBLTU(1, 2, 8), False), (InstructionBGEU(1, 2, 8), True)]:
+        m.state.reset()
+        m.issue(insn)
+        assert m.state.pc.value == (8 if taken else 4)
+
+
+def test_model_issue_trace():
+    m = Model(RV32I)
+    trace = m.issue(InstructionADDI(1, 0, -1))
+    assert [str(t) for t in trace] == ["x1 = ffffffff"]
+    assert m.issue(InstructionADDI(0, 1, 1)) == []
+    assert m.state.intreg[1].value == -1
+
+
+@pytest.mark.parametrize("insn, result", [
+    (InstructionAMOADD, 0xfffffffe),
+    (InstructionAMOAND, 0x1),
+    (InstructionAMOMIN, 0xfffffff9),
+    (InstructionAMOMAXU, 0xfffffff9),
+    (InstructionAMOMINU, 0x5),
+])
+def test_model_amo(insn, result):
+    m = Model(RV32A)
+    m.state.memory.memory[1] = 5
+    m.execute([
+        InstructionADDI(1, 0, 4),
+        InstructionADDI(2, 0, -7),
+        insn(3, 1, 2, 0, 0),
+    ])
+    check_model(m, {3: 5})
+    assert m.state.memory.memory[1] == result
+
+
+def test_model_issue_memory_trace():
+    m = Model(RV32I)
+    trace = m.issue(InstructionSW(0, 0, 8))
+    assert [str(t) for t in trace] == ["mem[8] = 00000000"]
+    assert m.state.memory.memory[2] == 0
+
+
+def test_simulator_data():
+    sim = Simulator(Model(RV32I))
+    data = bytes(range(12))
+    sim.load_data(data + b"\xff")
+    assert sim.model.state.memory.memory[1] == 0x07060504
+    assert sim.dump_data() == data
+    assert sim.dump_data(address=1, size=1) == data[4:8]
+
+
+def test_simulator_errors_propagate():
+    sim = Simulator(Model(RV32I))
+    sim.load_program([InstructionADDI(1, 40, 1)])
+    with pytest.raises(IndexError):
+        sim.run()
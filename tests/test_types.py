@@ -0,0 +1,53 @@
+from riscvmodel.types import Immediate, InvalidImmediateException, Register
+
+import pytest
+
+
+@pytest.mark.parametrize("kwargs,value", [
+    ({"bits": 12, "signed": True}, -2048),
+    ({"bits": 12, "signed": True}, 2047),
+    ({"bits": 5}, 31),
+    ({"bits": 13, "signed": True, "lsb0": True}, -4096),
+])
+def test_immediate_set(kwargs, value):
+    imm = Immediate(**kwargs)
+    imm.set(value)
+    assert imm.value == value
+
+
+@pytest.mark.parametrize("kwargs,value", [
+    ({"bits": 12, "signed": True}, -2049),
+    ({"bits": 12, "signed": True}, 2048),
+    ({"bits": 5}, 32),
+    ({"bits": 5}, -1),
+    ({"bits": 13, "signed": True, "lsb0": True}, 3),
+    ({"bits": 5}, "1"),
+])
+def test_immediate_set_invalid(kwargs, value):
+    with pytest.raises(InvalidImmediateException):
+        Immediate(**kwargs).set(value)
+
+
+@pytest.mark.parametrize("kwargs,bits,value", [
+    ({"bits": 12, "signed": True}, 0xfff, -1),
+    ({"bits": 12, "signed": True}, 0x7ff, 2047),
+    ({"bits": 6, "lsb0": True}, 0x3e, 62),
+])
+def test_immediate_set_from_bits(kwargs, bits, value):
+    imm = Immediate(**kwargs)
+    imm.set_from_bits(bits)
+    assert imm.value == value
+
+
+@pytest.mark.parametrize("value,expected", [
+    (1, 1),
+    (0x7fffffff, 0x7fffffff),
+    (0x80000000, -0x80000000),
+    (0xffffffff, -1),
+    (0x100000005, 5),
+])
+def test_register_set(value, expected):
+    reg = Register(32)
+    reg.set(value)
+    assert reg.value == expected
+    assert reg.unsigned() == value & 0xffffffff